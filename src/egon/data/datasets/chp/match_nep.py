@@ -15,6 +15,7 @@ from egon.data.datasets.power_plants import (
     filter_mastr_geometry,
     select_target,
 )
+from egon.data.datasets.power_plants.conventional import FEDERAL_STATE_CODES
 from egon.data.datasets.scenario_capacities import map_carrier
 
 
@@ -157,10 +158,11 @@ def select_chp_from_mastr(sources):
     )
 
     # Delete from Mastr_kov where carrier is not conventional
-    MaStR_konv = MaStR_konv[MaStR_konv.carrier.isin(map_carrier().keys())]
+    carrier_map = map_carrier()
+    MaStR_konv = MaStR_konv[MaStR_konv.carrier.isin(carrier_map.keys())]
 
     # Update carrier to match to eGon
-    MaStR_konv["carrier"] = map_carrier()[MaStR_konv["carrier"].values].values
+    MaStR_konv["carrier"] = carrier_map[MaStR_konv["carrier"].values].values
 
     # Drop individual CHP
     MaStR_konv = MaStR_konv[(MaStR_konv["el_capacity"] >= 100)]
@@ -215,37 +217,20 @@ def match_nep_chp(
 
     """
 
-    list_federal_states = pd.Series(
-        {
-            "Hamburg": "HH",
-            "Sachsen": "SN",
-            "MecklenburgVorpommern": "MV",
-            "Thueringen": "TH",
-            "SchleswigHolstein": "SH",
-            "Bremen": "HB",
-            "Saarland": "SL",
-            "Bayern": "BY",
-            "BadenWuerttemberg": "BW",
-            "Brandenburg": "BB",
-            "Hessen": "HE",
-            "NordrheinWestfalen": "NW",
-            "Berlin": "BE",
-            "Niedersachsen": "NI",
-            "SachsenAnhalt": "ST",
-            "RheinlandPfalz": "RP",
-        }
-    )
+    # Matched CHP and their index in MaStR, added to chp_NEP_matched at once
+    matches = []
+    matches_index = []
 
-    for ET in chp_NEP["carrier"].unique():
+    for ET, chp_NEP_carrier in chp_NEP[chp_NEP["postcode"] != "None"].groupby(
+        "carrier", sort=False
+    ):
 
-        for index, row in chp_NEP[
-            (chp_NEP["carrier"] == ET) & (chp_NEP["postcode"] != "None")
-        ].iterrows():
+        for index, row in chp_NEP_carrier.iterrows():
 
             # Select plants from MaStR that match carrier, PLZ
-            # and have a similar capacity
-            # Create a copy of all power plants from MaStR
-            selected = MaStR_konv.copy()
+            # and have a similar capacity, each constraint returns a new
+            # frame so MaStR_konv itself is not copied
+            selected = MaStR_konv
 
             # Set capacity constraint using buffer
             if consider_capacity:
@@ -271,36 +256,31 @@ def match_nep_chp(
                     selected.city == row.city.replace("\n", " ")
                 ]
             elif consider_location == "federal_state":
-                selected.loc[:, "federal_state"] = list_federal_states[
-                    selected.federal_state
-                ].values
                 selected = selected[
-                    selected.federal_state == row.federal_state
+                    selected.federal_state.map(FEDERAL_STATE_CODES)
+                    == row.federal_state
                 ]
 
             # Set capacity constraint if selected
             if consider_carrier:
                 selected = selected[selected.carrier == ET]
 
-            # If a plant could be matched, add this to chp_NEP_matched
+            # If a plant could be matched, add this to the matches
             if len(selected) > 0:
-                chp_NEP_matched = chp_NEP_matched.append(
-                    geopandas.GeoDataFrame(
-                        data={
-                            "source": "MaStR scaled with NEP 2021 list",
-                            "MaStRNummer": selected.EinheitMastrNummer.head(1),
-                            "carrier": (
-                                ET if row.c2035_chp == "Nein" else "gas"
-                            ),
-                            "chp": True,
-                            "el_capacity": row.c2035_capacity,
-                            "th_capacity": selected.th_capacity.head(1),
-                            "scenario": "eGon2035",
-                            "geometry": selected.geometry.head(1),
-                            "voltage_level": selected.voltage_level.head(1),
-                        }
-                    )
+                matches.append(
+                    {
+                        "source": "MaStR scaled with NEP 2021 list",
+                        "MaStRNummer": selected.EinheitMastrNummer.iat[0],
+                        "carrier": ET if row.c2035_chp == "Nein" else "gas",
+                        "chp": True,
+                        "el_capacity": row.c2035_capacity,
+                        "th_capacity": selected.th_capacity.iat[0],
+                        "scenario": "eGon2035",
+                        "geometry": selected.geometry.iat[0],
+                        "voltage_level": selected.voltage_level.iat[0],
+                    }
                 )
+                matches_index.append(selected.index[0])
 
                 # Drop matched CHP from chp_NEP
                 chp_NEP = chp_NEP.drop(index)
@@ -309,6 +289,11 @@ def match_nep_chp(
                 if consider_capacity & consider_carrier:
                     MaStR_konv = MaStR_konv.drop(selected.index)
 
+    if matches:
+        chp_NEP_matched = chp_NEP_matched.append(
+            geopandas.GeoDataFrame(matches, index=matches_index)
+        )
+
     return chp_NEP_matched, MaStR_konv, chp_NEP
 
 
@@ -134,9 +134,10 @@ def calc_load_curves_cts(scenario):
         "sources"
     ]
 
-    # Select demands per cts branch and nuts3-region
-    demands_nuts = db.select_dataframe(
-        f"""SELECT nuts3, wz, demand
+    # Select shares of cts branches per nuts3-region
+    nuts3_share_wz = db.select_dataframe(
+        f"""SELECT nuts3, wz,
+            demand / SUM(demand) OVER (PARTITION BY nuts3) AS demand
             FROM {sources['demandregio_cts']['schema']}.
             {sources['demandregio_cts']['table']}
             WHERE scenario = '{scenario}'
@@ -169,24 +170,16 @@ def calc_load_curves_cts(scenario):
         index_col="zensus_population_id",
     )
 
-    # Calculate shares of cts branches per nuts3-region
-    nuts3_share_wz = demands_nuts.groupby("nuts3").apply(
-        lambda grp: grp / grp.sum()
-    )
-
     # Calculate shares of cts branches per zensus cell
-    for wz in demands_nuts.index.get_level_values("wz").unique():
-        demands_zensus[wz] = 0
-        share = (
-            nuts3_share_wz[nuts3_share_wz.index.get_level_values("wz") == wz]
-            .reset_index()
-            .set_index("nuts3")
-            .demand
-        )
-        idx = demands_zensus.index[demands_zensus.nuts3.isin(share.index)]
-        demands_zensus.loc[idx, wz] = share[
-            demands_zensus.nuts3[idx].values
-        ].values
+    share_wide = (
+        nuts3_share_wz["demand"]
+        .unstack("wz", fill_value=0)
+        .reindex(columns=nuts3_share_wz.index.get_level_values("wz").unique())
+    )
+    demands_zensus = demands_zensus.join(share_wide, on="nuts3")
+    demands_zensus[share_wide.columns] = demands_zensus[
+        share_wide.columns
+    ].fillna(0)
 
     # Calculate shares of cts branches per hvmv substation
     share_subst = (
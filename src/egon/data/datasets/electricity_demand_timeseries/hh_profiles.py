@@ -121,12 +121,12 @@ This module docstring is rather a dataset documentation. Once, a decision
 is made in ... the content of this module docstring needs to be moved to
 docs attribute of the respective dataset class.
 """
-from itertools import cycle, product
+from itertools import chain, product
 from pathlib import Path
 import os
-import random
 
 from airflow.operators.python_operator import PythonOperator
+from scipy.sparse import csc_matrix
 from sqlalchemy import ARRAY, Column, Float, Integer, String
 from sqlalchemy.dialects.postgresql import CHAR, INTEGER, REAL
 from sqlalchemy.ext.declarative import declarative_base
@@ -210,7 +210,7 @@ class HouseholdDemands(Dataset):
 
         super().__init__(
             name="Household Demands",
-            version="0.0.10",
+            version="0.0.11",
             dependencies=dependencies,
             tasks=(
                 houseprofiles_in_census_cells,
@@ -220,32 +220,6 @@ class HouseholdDemands(Dataset):
         )
 
 
-def clean(x):
-    """Clean zensus household data row-wise
-
-    Clean dataset by
-
-    * converting '.' and '-' to str(0)
-    * removing brackets
-
-    Table can be converted to int/floats afterwards
-
-    Parameters
-    ----------
-    x: pd.Series
-        It is meant to be used with :code:`df.applymap()`
-
-    Returns
-    -------
-    pd.Series
-        Re-formatted data row
-    """
-    x = str(x).replace("-", str(0))
-    x = str(x).replace(".", str(0))
-    x = x.strip("()")
-    return x
-
-
 def write_hh_profiles_to_db(hh_profiles):
     """Write HH demand profiles of IEE into db. One row per profile type.
     The annual load profile timeseries is an array.
@@ -557,9 +531,11 @@ def process_nuts1_census_data(df_census_households_raw):
         Aggregated zensus household data on NUTS-1 level
     """
 
-    # Clean data to int only
-    df_census_households = df_census_households_raw.applymap(clean).applymap(
-        int
+    # Clean data to int only: convert '.' and '-' to 0 and remove brackets
+    df_census_households = (
+        df_census_households_raw.astype(str)
+        .replace({r"[-.]": "0", r"^[()]+|[()]+$": ""}, regex=True)
+        .astype(int)
     )
 
     # Group data to fit Load Profile Generator categories
@@ -575,27 +551,20 @@ def process_nuts1_census_data(df_census_households_raw):
     ]  # 15 < x <65
     seniors = ["65 - 74", "75 und älter"]  # >65
 
-    # sum groups of kids, adults and seniors and concat
-    df_kids = (
-        df_census_households.loc[:, (slice(None), kids)]
-        .groupby(level=0, axis=1)
-        .sum()
-    )
-    df_adults = (
-        df_census_households.loc[:, (slice(None), adults)]
-        .groupby(level=0, axis=1)
-        .sum()
-    )
-    df_seniors = (
-        df_census_households.loc[:, (slice(None), seniors)]
-        .groupby(level=0, axis=1)
+    # sum groups of kids, adults and seniors in a single pass, other age
+    # columns (totals) are dropped
+    age_groups = {
+        **dict.fromkeys(kids, "Kids"),
+        **dict.fromkeys(adults, "Adults"),
+        **dict.fromkeys(seniors, "Seniors"),
+    }
+    persons = df_census_households.columns.get_level_values(level=0)
+    ages = df_census_households.columns.get_level_values(level=1)
+    df_census_households = (
+        df_census_households.groupby([ages.map(age_groups), persons], axis=1)
         .sum()
-    )
-    df_census_households = pd.concat(
-        [df_kids, df_adults, df_seniors],
-        axis=1,
-        keys=["Kids", "Adults", "Seniors"],
-        names=["age", "persons"],
+        .reindex(columns=["Kids", "Adults", "Seniors"], level=0)
+        .rename_axis(columns=["age", "persons"])
     )
 
     # reduce column names to state only
@@ -724,17 +693,18 @@ def regroup_nuts1_census_data(df_census_households_nuts1):
         # no info about share of kids
     }
 
-    # absolute values
-    df_hh_distribution_abs = pd.DataFrame(
-        (
-            {
-                hhtype: df_census_households_nuts1.loc[countries, codes].sum()
-                for hhtype, codes in hh_types_eurostat.items()
-            }
-            for countries in df_census_households_nuts1.index
-        ),
-        index=df_census_households_nuts1.index,
+    # map census categories to household types and sum them up for all
+    # federal states in a single matrix product
+    mapping = pd.DataFrame(
+        0,
+        index=df_census_households_nuts1.columns,
+        columns=list(hh_types_eurostat),
     )
+    for hhtype, codes in hh_types_eurostat.items():
+        mapping.loc[codes, hhtype] = 1
+
+    # absolute values
+    df_hh_distribution_abs = df_census_households_nuts1.dot(mapping)
     # drop zero columns
     df_hh_distribution_abs = df_hh_distribution_abs.loc[
         :, (df_hh_distribution_abs != 0).any(axis=0)
@@ -1116,42 +1086,33 @@ def refine_census_data_at_cell_level(
 
     # Calculate fraction of fine household types within subgroup of
     # rough household types
-    df_dist_households = df_census_households_nuts1.copy()
-    for value in mapping_zensus_hh_subgroups.values():
-        df_dist_households.loc[value] = df_census_households_nuts1.loc[
-            value
-        ].div(df_census_households_nuts1.loc[value].sum())
+    hh_5type_of_hh_type = {
+        hh_type: hh_5type
+        for hh_5type, hh_10types in mapping_zensus_hh_subgroups.items()
+        for hh_type in hh_10types
+    }
+    df_dist_households = df_census_households_nuts1.div(
+        df_census_households_nuts1.groupby(
+            df_census_households_nuts1.index.map(hh_5type_of_hh_type)
+        ).transform("sum")
+    )
 
     # Refine from hh_5types to hh_10types
-    df_distribution_nuts0 = pd.DataFrame()
-    # Loop over federal states
-    for gen, df_nuts1 in df_census_households_grid.groupby("gen"):
-        # take subgroup distribution from federal state
-        dist_households_nuts1 = df_dist_households[gen]
-
-        df_distribution_nuts1 = pd.DataFrame()
-        # loop over hh_5types as cluster
-        for (
-            hh_5type_cluster,
-            hh_10types_cluster,
-        ) in mapping_zensus_hh_subgroups.items():
-            # get census household of hh_5type and federal state
-            df_group = df_nuts1.loc[
-                df_nuts1["characteristics_code"] == hh_5type_cluster
-            ]
-
-            # apply proportionate allocation function within cluster
-            df_distribution_group = proportionate_allocation(
-                df_group, dist_households_nuts1, hh_10types_cluster
-            )
-            df_distribution_group["characteristics_code"] = hh_5type_cluster
-            df_distribution_nuts1 = df_distribution_nuts1.append(
-                df_distribution_group
-            )
-
-        df_distribution_nuts0 = df_distribution_nuts0.append(
-            df_distribution_nuts1
+    distribution_groups = []
+    # Loop over federal states and hh_5types as cluster
+    for (gen, hh_5type_cluster), df_group in df_census_households_grid.groupby(
+        ["gen", "characteristics_code"]
+    ):
+        # apply proportionate allocation function within cluster using the
+        # subgroup distribution of the federal state
+        df_distribution_group = proportionate_allocation(
+            df_group,
+            df_dist_households[gen],
+            mapping_zensus_hh_subgroups[hh_5type_cluster],
         )
+        df_distribution_group["characteristics_code"] = hh_5type_cluster
+        distribution_groups.append(df_distribution_group)
+    df_distribution_nuts0 = pd.concat(distribution_groups)
 
     df_census_households_grid_refined = df_census_households_grid.merge(
         df_distribution_nuts0,
@@ -1173,7 +1134,7 @@ def refine_census_data_at_cell_level(
     return df_census_households_grid_refined
 
 
-def get_cell_demand_profile_ids(df_cell, pool_size):
+def get_cell_demand_profile_ids(df_cell, pool_size, rng):
     """
     Generates tuple of hh_type and zensus cell ids
 
@@ -1186,8 +1147,10 @@ def get_cell_demand_profile_ids(df_cell, pool_size):
     ----------
     df_cell: pd.DataFrame
         Household type information for a single zensus cell
-    pool_size: int
-        Number of available profiles to select from
+    pool_size: dict
+        Number of available profiles to select from per hh_type
+    rng: np.random.Generator
+        Random number generator to draw the samples with
 
     Returns
     -------
@@ -1195,32 +1158,32 @@ def get_cell_demand_profile_ids(df_cell, pool_size):
         List of (`hh_type`, `cell_id`)
 
     """
-    # maybe use instead
-    # np.random.default_rng().integers(low=0, high=pool_size[hh_type], size=sq)
-    # instead of random.sample use random.choices() if with replacement
     # list of sample ids per hh_type in cell
     cell_profile_ids = [
-        (hh_type, random.sample(range(pool_size[hh_type]), k=sq))
-        if pool_size[hh_type] >= sq
-        else (hh_type, random.choices(range(pool_size[hh_type]), k=sq))
+        (
+            hh_type,
+            rng.choice(
+                pool_size[hh_type], size=sq, replace=pool_size[hh_type] < sq
+            ),
+        )
         for hh_type, sq in zip(
             df_cell["hh_type"],
             df_cell["hh_10types"],
         )
     ]
 
-    # format to lists of tuples (hh_type, id)
+    # format to list of tuples (hh_type, id)
     cell_profile_ids = [
-        list(zip(cycle([hh_type]), ids)) for hh_type, ids in cell_profile_ids
+        (hh_type, profile_id)
+        for hh_type, ids in cell_profile_ids
+        for profile_id in ids.tolist()
     ]
-    # reduce to list
-    cell_profile_ids = [a for b in cell_profile_ids for a in b]
 
     return cell_profile_ids
 
 
 # can be parallelized with grouping df_zensus_cells by grid_id/nuts3/nuts1
-def assign_hh_demand_profiles_to_cells(df_zensus_cells, df_iee_profiles):
+def assign_hh_demand_profiles_to_cells(df_zensus_cells, df_iee_profiles, rng):
     """
     Assign household demand profiles to each census cell.
 
@@ -1240,6 +1203,9 @@ def assign_hh_demand_profiles_to_cells(df_zensus_cells, df_iee_profiles):
         * Index: Times steps as serial integers
         * Columns: pd.MultiIndex with (`HH_TYPE`, `id`)
 
+    rng: np.random.Generator
+        Random number generator to sample the profiles with
+
     Returns
     -------
     pd.DataFrame
@@ -1250,47 +1216,36 @@ def assign_hh_demand_profiles_to_cells(df_zensus_cells, df_iee_profiles):
         cell.
     """
 
-    df_hh_profiles_in_census_cells = pd.DataFrame(
-        index=df_zensus_cells.grid_id.unique(),
-        columns=[
-            "cell_profile_ids",
-            "cell_id",
-            "nuts3",
-            "nuts1",
-            "factor_2035",
-            "factor_2050",
-        ],
-    )
-
-    df_hh_profiles_in_census_cells = (
-        df_hh_profiles_in_census_cells.rename_axis("grid_id")
+    # number of available profiles per hh_type
+    pool_size = (
+        df_iee_profiles.columns.get_level_values(0).value_counts().to_dict()
     )
 
-    pool_size = df_iee_profiles.groupby(level=0, axis=1).size()
-
     # only use non zero entries
     df_zensus_cells = df_zensus_cells.loc[df_zensus_cells["hh_10types"] != 0]
-    for grid_id, df_cell in df_zensus_cells.groupby(by="grid_id"):
-
-        # random sampling of household profiles for each cell
-        # with or without replacement (see :func:`get_cell_demand_profile_ids`)
-        # within cell but after number of households are rounded to the nearest
-        # integer if float this results in a small deviation for the course of
-        # the aggregated profiles.
-        cell_profile_ids = get_cell_demand_profile_ids(df_cell, pool_size)
-
-        df_hh_profiles_in_census_cells.at[grid_id, "cell_id"] = df_cell.loc[
-            :, "cell_id"
-        ].unique()[0]
-        df_hh_profiles_in_census_cells.at[
-            grid_id, "cell_profile_ids"
-        ] = cell_profile_ids
-        df_hh_profiles_in_census_cells.at[grid_id, "nuts3"] = df_cell.loc[
-            :, "nuts3"
-        ].unique()[0]
-        df_hh_profiles_in_census_cells.at[grid_id, "nuts1"] = df_cell.loc[
-            :, "nuts1"
-        ].unique()[0]
+    df_grouped = df_zensus_cells.groupby(by="grid_id")
+
+    # cell_id, nuts3 and nuts1 are the same for all rows of a cell
+    df_hh_profiles_in_census_cells = df_grouped.agg(
+        cell_id=("cell_id", "first"),
+        nuts3=("nuts3", "first"),
+        nuts1=("nuts1", "first"),
+    )
+
+    # random sampling of household profiles for each cell
+    # with or without replacement (see :func:`get_cell_demand_profile_ids`)
+    # within cell but after number of households are rounded to the nearest
+    # integer if float this results in a small deviation for the course of
+    # the aggregated profiles.
+    df_hh_profiles_in_census_cells.insert(
+        0,
+        "cell_profile_ids",
+        df_grouped.apply(
+            get_cell_demand_profile_ids, pool_size=pool_size, rng=rng
+        ),
+    )
+    df_hh_profiles_in_census_cells["factor_2035"] = np.nan
+    df_hh_profiles_in_census_cells["factor_2050"] = np.nan
 
     return df_hh_profiles_in_census_cells
 
@@ -1326,32 +1281,51 @@ def adjust_to_demand_regio_nuts3_annual(
         Returns the same data as :func:`assign_hh_demand_profiles_to_cells`,
         but with filled columns `factor_2035` and `factor_2050`.
     """
-    for nuts3_id, df_nuts3 in df_hh_profiles_in_census_cells.groupby(
-        by="nuts3"
-    ):
-        nuts3_cell_ids = df_nuts3.index
-        nuts3_profile_ids = df_nuts3.loc[:, "cell_profile_ids"].sum()
+    # annual sum of each profile in Wh and its column position
+    profiles_sum_annual = df_iee_profiles.to_numpy().sum(
+        axis=0, dtype=np.float64
+    )
+    profile_index = {
+        profile: i for i, profile in enumerate(df_iee_profiles.columns)
+    }
 
-        # take all profiles of one nuts3, aggregate and sum
-        # profiles in Wh
-        nuts3_profiles_sum_annual = (
-            df_iee_profiles.loc[:, nuts3_profile_ids].sum().sum()
+    # take all profiles of one nuts3 and sum
+    # profiles in Wh
+    nuts3_codes, nuts3_ids = pd.factorize(
+        df_hh_profiles_in_census_cells["nuts3"]
+    )
+    profile_columns = [
+        profile_index[profile]
+        for profile in chain.from_iterable(
+            df_hh_profiles_in_census_cells["cell_profile_ids"]
         )
+    ]
+    nuts3_profiles_sum_annual = pd.Series(
+        np.bincount(
+            np.repeat(
+                nuts3_codes,
+                df_hh_profiles_in_census_cells["cell_profile_ids"].str.len(),
+            ),
+            weights=profiles_sum_annual[profile_columns],
+            minlength=len(nuts3_ids),
+        ),
+        index=nuts3_ids,
+    )
 
-        # Scaling Factor
-        # ##############
-        # demand regio in MWh
-        # profiles in Wh
-        df_hh_profiles_in_census_cells.loc[nuts3_cell_ids, "factor_2035"] = (
-            df_demand_regio.loc[(2035, nuts3_id), "demand_mwha"]
-            * 1e3
-            / (nuts3_profiles_sum_annual / 1e3)
-        )
-        df_hh_profiles_in_census_cells.loc[nuts3_cell_ids, "factor_2050"] = (
-            df_demand_regio.loc[(2050, nuts3_id), "demand_mwha"]
-            * 1e3
-            / (nuts3_profiles_sum_annual / 1e3)
-        )
+    # Scaling Factor
+    # ##############
+    # demand regio in MWh
+    # profiles in Wh
+    df_factors = (
+        df_demand_regio["demand_mwha"]
+        .unstack(level="year")
+        .mul(1e3)
+        .div(nuts3_profiles_sum_annual / 1e3, axis=0)
+    )
+    for year in [2035, 2050]:
+        df_hh_profiles_in_census_cells[
+            f"factor_{year}"
+        ] = df_hh_profiles_in_census_cells["nuts3"].map(df_factors[year])
 
     return df_hh_profiles_in_census_cells
 
@@ -1401,40 +1375,56 @@ def get_load_timeseries(
         series in MWh.
     """
     timesteps = len(df_iee_profiles)
-    if aggregate:
-        full_load = pd.Series(
-            data=np.zeros(timesteps), dtype=np.float64, index=range(timesteps)
-        )
-    else:
-        full_load = pd.DataFrame(index=range(timesteps))
     load_area_meta = df_hh_profiles_in_census_cells.loc[
         cell_ids, ["cell_profile_ids", "nuts3", f"factor_{year}"]
     ]
-    # loop over nuts3 (part_load) and sum (full_load) as the scaling factor
-    # applies at nuts3 level
-    for (nuts3, factor), df in load_area_meta.groupby(
-        by=["nuts3", f"factor_{year}"]
-    ):
-        if aggregate:
-            part_load = (
-                df_iee_profiles.loc[:, df["cell_profile_ids"].sum()].sum(
-                    axis=1
-                )
-                * factor
-                / 1e6
-            )  # from Wh to MWh
-            full_load = full_load.add(part_load)
-        elif not aggregate:
-            part_load = (
-                df_iee_profiles.loc[:, df["cell_profile_ids"].sum()]
-                * factor
-                / 1e6
+    # the scaling factor applies at nuts3 level
+    load_area_groups = load_area_meta.groupby(by=["nuts3", f"factor_{year}"])
+    # column position of each profile
+    profile_index = {
+        profile: i for i, profile in enumerate(df_iee_profiles.columns)
+    }
+    if aggregate:
+        # weight each profile by its scaling factor and number of occurrences
+        # and sum all profiles in a single matrix product
+        weights = np.zeros(len(profile_index))
+        for (nuts3, factor), df in load_area_groups:
+            np.add.at(
+                weights,
+                [
+                    profile_index[profile]
+                    for profile in chain.from_iterable(df["cell_profile_ids"])
+                ],
+                factor / 1e6,
             )  # from Wh to MWh
-            full_load = pd.concat([full_load, part_load], axis=1).dropna(
-                axis=1
-            )
-        else:
-            raise KeyError("Parameter 'aggregate' needs to be bool value!")
+        # only multiply used profiles, in double precision and in chunks to
+        # limit the size of the copied profiles
+        used = np.flatnonzero(weights)
+        profiles = df_iee_profiles.to_numpy()
+        full_load = np.zeros(timesteps)
+        for i in range(0, len(used), 1024):
+            chunk = used[i : i + 1024]
+            full_load += profiles[:, chunk].astype(np.float64) @ weights[chunk]
+        full_load = pd.Series(
+            data=full_load, dtype=np.float64, index=range(timesteps)
+        )
+    else:
+        # scale profiles per nuts3 (part_load) and concat (full_load)
+        part_loads = [
+            df_iee_profiles.iloc[
+                :,
+                [
+                    profile_index[profile]
+                    for profile in chain.from_iterable(df["cell_profile_ids"])
+                ],
+            ]
+            * factor
+            / 1e6  # from Wh to MWh
+            for (nuts3, factor), df in load_area_groups
+        ]
+        full_load = pd.concat(
+            [pd.DataFrame(index=range(timesteps)), *part_loads], axis=1
+        ).dropna(axis=1)
     if peak_load_only:
         full_load = full_load.max()
     return full_load
@@ -1449,11 +1439,19 @@ def write_refinded_households_to_db(df_census_households_grid_refined):
         bind=engine, checkfirst=True
     )
 
-    with db.session_scope() as session:
-        session.bulk_insert_mappings(
-            EgonDestatisZensusHouseholdPerHaRefined,
-            df_census_households_grid_refined.to_dict(orient="records"),
-        )
+    columns = [
+        column.name
+        for column in EgonDestatisZensusHouseholdPerHaRefined.__table__.columns
+        if column.name in df_census_households_grid_refined.columns
+    ]
+    df_census_households_grid_refined[columns].to_sql(
+        name=EgonDestatisZensusHouseholdPerHaRefined.__table__.name,
+        schema=EgonDestatisZensusHouseholdPerHaRefined.__table__.schema,
+        con=engine,
+        if_exists="append",
+        index=False,
+        method=db.copy_insert,
+    )
 
 
 def houseprofiles_in_census_cells():
@@ -1474,8 +1472,8 @@ def houseprofiles_in_census_cells():
         return a
 
     # Init random generators using global seed
-    random.seed(RANDOM_SEED)
     np.random.seed(RANDOM_SEED)
+    rng = np.random.default_rng(RANDOM_SEED)
 
     # Read demand profiles from egon-data-bundle
     df_iee_profiles = get_iee_hh_demand_profiles_raw()
@@ -1483,8 +1481,10 @@ def houseprofiles_in_census_cells():
     # Write raw profiles into db
     write_hh_profiles_to_db(df_iee_profiles)
 
-    # Process profiles for further use
-    df_iee_profiles = set_multiindex_to_profiles(df_iee_profiles)
+    # Process profiles for further use, in single precision as in the db
+    df_iee_profiles = set_multiindex_to_profiles(
+        df_iee_profiles.astype(np.float32)
+    )
 
     # Download zensus household NUTS-1 data with family type and age categories
     df_census_households_nuts1_raw = get_census_households_nuts1_raw()
@@ -1524,7 +1524,7 @@ def houseprofiles_in_census_cells():
 
     # Allocate profile ids to each cell by census data
     df_hh_profiles_in_census_cells = assign_hh_demand_profiles_to_cells(
-        df_census_households_grid_refined, df_iee_profiles
+        df_census_households_grid_refined, df_iee_profiles, rng
     )
 
     # Annual household electricity demand on NUTS-3 level (demand regio)
@@ -1549,11 +1549,11 @@ def houseprofiles_in_census_cells():
         "cell_id"
     ].astype(int)
 
-    # Cast profile ids back to initial str format
+    # Cast profile ids back to initial str format as array literal
     df_hh_profiles_in_census_cells[
         "cell_profile_ids"
     ] = df_hh_profiles_in_census_cells["cell_profile_ids"].apply(
-        lambda x: list(map(gen_profile_names, x))
+        lambda x: "{" + ",".join(map(gen_profile_names, x)) + "}"
     )
 
     # Write allocation table into database
@@ -1564,11 +1564,14 @@ def houseprofiles_in_census_cells():
         bind=engine, checkfirst=True
     )
 
-    with db.session_scope() as session:
-        session.bulk_insert_mappings(
-            HouseholdElectricityProfilesInCensusCells,
-            df_hh_profiles_in_census_cells.to_dict(orient="records"),
-        )
+    df_hh_profiles_in_census_cells.to_sql(
+        name=HouseholdElectricityProfilesInCensusCells.__table__.name,
+        schema=HouseholdElectricityProfilesInCensusCells.__table__.schema,
+        con=engine,
+        if_exists="append",
+        index=False,
+        method=db.copy_insert,
+    )
 
 
 def get_houseprofiles_in_census_cells():
@@ -1739,12 +1742,6 @@ def mv_grid_district_HH_electricity_load(
         Demand is given in kWh.
     """
 
-    def tuple_format(x):
-        """Convert Profile ids from string to tuple (type, id)
-        Convert from (str)a000(int) to (str), (int)
-        """
-        return x[:2], int(x[3:])
-
     with db.session_scope() as session:
         cells_query = session.query(
             HouseholdElectricityProfilesInCensusCells,
@@ -1759,33 +1756,55 @@ def mv_grid_district_HH_electricity_load(
         cells_query.statement, cells_query.session.bind, index_col="cell_id"
     )
 
-    # convert profile ids to tuple (type, id) format
-    cells["cell_profile_ids"] = cells["cell_profile_ids"].apply(
-        lambda x: list(map(tuple_format, x))
-    )
-
     # Read demand profiles from egon-data-bundle
     df_iee_profiles = get_iee_hh_demand_profiles_raw()
 
-    # Process profiles for further use
-    df_iee_profiles = set_multiindex_to_profiles(df_iee_profiles)
-
-    # Create aggregated load profile for each MV grid district
-    mvgd_profiles_dict = {}
-    for grid_district, data in cells.groupby("bus_id"):
-        mvgd_profile = get_load_timeseries(
-            df_iee_profiles=df_iee_profiles,
-            df_hh_profiles_in_census_cells=data,
-            cell_ids=data.index,
-            year=scenario_year,
-            peak_load_only=False,
-        )
-        mvgd_profiles_dict[grid_district] = [mvgd_profile.round(3).to_list()]
-    mvgd_profiles = pd.DataFrame.from_dict(mvgd_profiles_dict, orient="index")
+    # Process profiles for further use, in single precision as in the db
+    df_iee_profiles = set_multiindex_to_profiles(
+        df_iee_profiles.astype(np.float32)
+    )
 
-    # Reshape data: put MV grid ids in columns to a single index column
-    mvgd_profiles = mvgd_profiles.reset_index()
-    mvgd_profiles.columns = ["bus_id", "p_set"]
+    # Weight of each profile in each MV grid district: scaling factor of the
+    # cell times number of occurrences, from Wh to MWh. Cells without
+    # scaling factor are not considered. Profiles are referenced by their id
+    # in the format (str)a000(int) as stored in the db.
+    profile_index = {
+        f"{hh_type}a{profile_id:05d}": i
+        for i, (hh_type, profile_id) in enumerate(df_iee_profiles.columns)
+    }
+    bus_codes, bus_ids = pd.factorize(cells["bus_id"], sort=True)
+    profiles_per_cell = cells["cell_profile_ids"].str.len()
+    weights = csc_matrix(
+        (
+            np.repeat(
+                cells[f"factor_{scenario_year}"].fillna(0).to_numpy() / 1e6,
+                profiles_per_cell,
+            ),
+            (
+                np.repeat(bus_codes, profiles_per_cell),
+                [
+                    profile_index[profile]
+                    for profile in chain.from_iterable(
+                        cells["cell_profile_ids"]
+                    )
+                ],
+            ),
+        ),
+        shape=(len(bus_ids), len(profile_index)),
+    )
+
+    # Create aggregated load profile for all MV grid districts at once, in
+    # double precision and in chunks of profiles to limit memory usage
+    profiles = df_iee_profiles.to_numpy()
+    mvgd_loads = np.zeros((len(bus_ids), len(profiles)))
+    for i in range(0, len(profile_index), 1024):
+        mvgd_loads += weights[:, i : i + 1024] @ profiles[
+            :, i : i + 1024
+        ].T.astype(np.float64)
+
+    mvgd_profiles = pd.DataFrame(
+        {"bus_id": bus_ids, "p_set": mvgd_loads.round(3).tolist()}
+    )
 
     # Add remaining columns
     mvgd_profiles["scn_name"] = scenario_name
@@ -1797,15 +1816,17 @@ def mv_grid_district_HH_electricity_load(
     EgonEtragoElectricityHouseholds.__table__.create(
         bind=engine, checkfirst=True
     )
-    # Insert data into respective database table
+    # Insert data into respective database table, timeseries as array literal
+    mvgd_profiles["p_set"] = mvgd_profiles["p_set"].apply(
+        lambda x: "{" + ",".join(map(str, x)) + "}"
+    )
     mvgd_profiles.to_sql(
         name=EgonEtragoElectricityHouseholds.__table__.name,
         schema=EgonEtragoElectricityHouseholds.__table__.schema,
         con=engine,
         if_exists="append",
-        method="multi",
-        chunksize=10000,
         index=False,
+        method=db.copy_insert,
     )
 
 
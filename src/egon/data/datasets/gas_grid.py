@@ -60,7 +60,7 @@ class GasNodesAndPipes(Dataset):
     #:
     name: str = "GasNodesAndPipes"
     #:
-    version: str = "0.0.9"
+    version: str = "0.0.10"
 
     def __init__(self, dependencies):
         super().__init__(
@@ -114,10 +114,7 @@ def download_SciGRID_gas_data():
         files.append("data/" + basename + "_" + i + ".csv")
 
     with ZipFile(zip_file, "r") as zipObj:
-        listOfFileNames = zipObj.namelist()
-        for fileName in listOfFileNames:
-            if fileName in files:
-                zipObj.extract(fileName, path)
+        zipObj.extractall(path, members=files)
 
 
 def define_gas_nodes_list():
@@ -184,9 +181,7 @@ def ch4_nodes_number_G(gas_nodes_list):
 
     """
 
-    ch4_nodes_list = gas_nodes_list[
-        gas_nodes_list["country_code"].str.match("DE")
-    ]
+    ch4_nodes_list = gas_nodes_list[gas_nodes_list["country_code"] == "DE"]
     N_ch4_nodes_G = len(ch4_nodes_list)
 
     return N_ch4_nodes_G
@@ -218,16 +213,9 @@ def insert_CH4_nodes_list(gas_nodes_list):
     engine = db.engine()
 
     gas_nodes_list = gas_nodes_list[
-        gas_nodes_list["country_code"].str.match("DE")
+        gas_nodes_list["country_code"] == "DE"
     ]  # To eventually replace with a test if the nodes are in the german boundaries.
 
-    # Cut data to federal state if in testmode
-    NUTS1 = []
-    for index, row in gas_nodes_list.iterrows():
-        param = ast.literal_eval(row["param"])
-        NUTS1.append(param["nuts_id_1"])
-    gas_nodes_list = gas_nodes_list.assign(NUTS1=NUTS1)
-
     boundary = settings()["egon-data"]["--dataset-boundary"]
     if boundary != "Everything":
         map_states = {
@@ -249,30 +237,30 @@ def insert_CH4_nodes_list(gas_nodes_list):
             "Bayern": "DE2",
         }
 
+        # Cut data to federal state if in testmode
+        nuts1 = pd.Series(
+            [
+                ast.literal_eval(param)["nuts_id_1"]
+                for param in gas_nodes_list["param"]
+            ],
+            index=gas_nodes_list.index,
+        )
         gas_nodes_list = gas_nodes_list[
-            gas_nodes_list["NUTS1"].isin([map_states[boundary], np.nan])
+            nuts1.isin([map_states[boundary], np.nan])
         ]
 
         # A completer avec nodes related to pipelines which have an end in the selected area et evt deplacer ds define_gas_nodes_list
 
-    # Add missing columns
+    # Add missing columns and remove useless ones
     c = {"scn_name": "eGon2035", "carrier": "CH4"}
-    gas_nodes_list = gas_nodes_list.assign(**c)
-
     gas_nodes_list = geopandas.GeoDataFrame(
-        gas_nodes_list,
+        gas_nodes_list.drop(columns=["param", "country_code"])
+        .assign(**c)
+        .reset_index(drop=True),
         geometry=geopandas.points_from_xy(
-            gas_nodes_list["x"], gas_nodes_list["y"]
+            gas_nodes_list["x"], gas_nodes_list["y"], crs=4326
         ),
-    )
-    gas_nodes_list = gas_nodes_list.rename(
-        columns={"geometry": "geom"}
-    ).set_geometry("geom", crs=4326)
-
-    gas_nodes_list = gas_nodes_list.reset_index(drop=True)
-    gas_nodes_list = gas_nodes_list.drop(
-        columns=["NUTS1", "param", "country_code"]
-    )
+    ).rename_geometry("geom")
 
     # Insert data to db
     db.execute_sql(
@@ -493,10 +481,8 @@ def insert_gas_pipeline_list(
     # Remove links disconnected of the rest of the grid
     # Remove manually for disconnected link EntsoG_Map__ST_195 and EntsoG_Map__ST_108
     gas_pipelines_list = gas_pipelines_list[
-        gas_pipelines_list["node_id"] != "['SEQ_11790_p', 'Stor_EU_107']"
-    ]
-    gas_pipelines_list = gas_pipelines_list[
-        ~gas_pipelines_list["id"].str.match("EntsoG_Map__ST_108")
+        (gas_pipelines_list["node_id"] != "['SEQ_11790_p', 'Stor_EU_107']")
+        & ~gas_pipelines_list["id"].str.startswith("EntsoG_Map__ST_108")
     ]
 
     # Manually add pipeline to artificially connect isolated pipeline
@@ -515,13 +501,19 @@ def insert_gas_pipeline_list(
     )
     gas_pipelines_list["link_id"] = gas_pipelines_list["link_id"].astype(int)
 
-    # Cut data to federal state if in testmode
-    NUTS1 = []
-    for index, row in gas_pipelines_list.iterrows():
-        param = ast.literal_eval(row["param"])
-        NUTS1.append(param["nuts_id_1"])
-    gas_pipelines_list["NUTS1"] = NUTS1
+    # Parse the parameters of all pipelines once into columns
+    params = pd.DataFrame(
+        [ast.literal_eval(param) for param in gas_pipelines_list["param"]],
+        index=gas_pipelines_list.index,
+    )
+    gas_pipelines_list["diameter"] = params["diameter_mm"]
+    gas_pipelines_list["length_km"] = params["length_km"]
+    gas_pipelines_list["path_long"] = params["path_long"]
+    gas_pipelines_list["path_lat"] = params["path_lat"]
+    gas_pipelines_list["NUTS1_0"] = params["nuts_id_1"].str[0]
+    gas_pipelines_list["NUTS1_1"] = params["nuts_id_1"].str[1]
 
+    # Cut data to federal state if in testmode
     map_states = {
         "Baden-Württemberg": "DE1",
         "Nordrhein-Westfalen": "DEA",
@@ -541,8 +533,6 @@ def insert_gas_pipeline_list(
         "Bayern": "DE2",
         "Everything": "Nan",
     }
-    gas_pipelines_list["NUTS1_0"] = [x[0] for x in gas_pipelines_list["NUTS1"]]
-    gas_pipelines_list["NUTS1_1"] = [x[1] for x in gas_pipelines_list["NUTS1"]]
 
     boundary = settings()["egon-data"]["--dataset-boundary"]
 
@@ -559,37 +549,33 @@ def insert_gas_pipeline_list(
     gas_pipelines_list["p_nom_extendable"] = False
     gas_pipelines_list["p_min_pu"] = -1.0
 
-    diameter = []
-    geom = []
-    topo = []
-    length_km = []
+    # Parse the coordinates of the pipeline ends once
+    gas_pipelines_list["long"] = gas_pipelines_list["long"].map(json.loads)
+    gas_pipelines_list["lat"] = gas_pipelines_list["lat"].map(json.loads)
 
-    for index, row in gas_pipelines_list.iterrows():
+    # The topology connects both ends, the geometry follows the path of
+    # the pipeline with one segment between each pair of coordinates
+    gas_pipelines_list["topo"] = [
+        geometry.LineString(list(zip(long_e, lat_e)))
+        for long_e, lat_e in zip(
+            gas_pipelines_list["long"], gas_pipelines_list["lat"]
+        )
+    ]
 
-        param = ast.literal_eval(row["param"])
-        diameter.append(param["diameter_mm"])
-        length_km.append(param["length_km"])
-
-        long_e = json.loads(row["long"])
-        lat_e = json.loads(row["lat"])
-        crd_e = list(zip(long_e, lat_e))
-        topo.append(geometry.LineString(crd_e))
-
-        long_path = param["path_long"]
-        lat_path = param["path_lat"]
-        crd = list(zip(long_path, lat_path))
-        crd.insert(0, crd_e[0])
-        crd.append(crd_e[1])
-        lines = []
-        for i in range(len(crd) - 1):
-            lines.append(geometry.LineString([crd[i], crd[i + 1]]))
-        geom.append(geometry.MultiLineString(lines))
-
-    gas_pipelines_list["diameter"] = diameter
+    geom = []
+    for long_e, lat_e, long_path, lat_path in zip(
+        gas_pipelines_list["long"],
+        gas_pipelines_list["lat"],
+        gas_pipelines_list["path_long"],
+        gas_pipelines_list["path_lat"],
+    ):
+        crd = [
+            (long_e[0], lat_e[0]),
+            *zip(long_path, lat_path),
+            (long_e[1], lat_e[1]),
+        ]
+        geom.append(geometry.MultiLineString(list(zip(crd[:-1], crd[1:]))))
     gas_pipelines_list["geom"] = geom
-    gas_pipelines_list["topo"] = topo
-    gas_pipelines_list["length_km"] = length_km
-    gas_pipelines_list = gas_pipelines_list.set_geometry("geom", crs=4326)
 
     country_0 = []
     country_1 = []
@@ -620,9 +606,13 @@ def insert_gas_pipeline_list(
 
     # Remove uncorrect pipelines
     gas_pipelines_list = gas_pipelines_list[
-        (gas_pipelines_list["id"] != "PLNG_2637_Seg_0_Seg_0_Seg_0")
-        & (gas_pipelines_list["id"] != "NSG_6650_Seg_2_Seg_0")
-        & (gas_pipelines_list["id"] != "NSG_6734_Seg_2_Seg_0")
+        ~gas_pipelines_list["id"].isin(
+            [
+                "PLNG_2637_Seg_0_Seg_0_Seg_0",
+                "NSG_6650_Seg_2_Seg_0",
+                "NSG_6734_Seg_2_Seg_0",
+            ]
+        )
     ]
 
     # Remove link test if length = 0
@@ -631,120 +621,68 @@ def insert_gas_pipeline_list(
     ]
 
     # Adjust columns
-    bus0 = []
-    bus1 = []
-    geom_adjusted = []
-    topo_adjusted = []
-    length_adjusted = []
-    pipe_class = []
+    # Pipelines with an end abroad or, in testmode, outside of the selected
+    # federal state are connected to the bus of the country at this end.
+    # Only one end is adjusted and the start of the pipeline comes first.
+    abroad_0 = gas_pipelines_list["country_0"] != "DE"
+    abroad_1 = gas_pipelines_list["country_1"] != "DE"
+    if boundary != "Everything":
+        abroad_0 |= gas_pipelines_list["NUTS1_0"] != map_states[boundary]
+        abroad_1 |= gas_pipelines_list["NUTS1_1"] != map_states[boundary]
+    abroad_1 &= ~abroad_0
+
+    # Look up bus and coordinates of both ends, either from the node list
+    # or from the bus of the country
+    node_ids = gas_pipelines_list["node_id"].str.strip("][").str.split(", ")
+    ends = []
+    for i, abroad in enumerate([abroad_0, abroad_1]):
+        country = gas_pipelines_list.loc[abroad, f"country_{i}"]
+        end = pd.DataFrame(
+            {
+                "bus": node_ids.str[i].str[1:-1].map(gas_nodes_list["bus_id"]),
+                "x": gas_pipelines_list["long"].str[i],
+                "y": gas_pipelines_list["lat"].str[i],
+            }
+        )
+        end.loc[abroad, ["bus", "x", "y"]] = abroad_gas_nodes_list.loc[
+            country, ["bus_id", "x", "y"]
+        ].values
+        ends.append(end)
+
+    gas_pipelines_list["bus0"] = ends[0]["bus"].astype(int)
+    gas_pipelines_list["bus1"] = ends[1]["bus"].astype(int)
+
+    # Adjusted pipelines are replaced by a straight line between both ends
+    topo_adjusted = [
+        geometry.LineString([(x0, y0), (x1, y1)]) if adjusted else topo
+        for adjusted, topo, x0, y0, x1, y1 in zip(
+            abroad_0 | abroad_1,
+            gas_pipelines_list["topo"],
+            ends[0]["x"],
+            ends[0]["y"],
+            ends[1]["x"],
+            ends[1]["y"],
+        )
+    ]
+    geom_adjusted = [
+        geometry.MultiLineString([topo]) if adjusted else geom
+        for adjusted, topo, geom in zip(
+            abroad_0 | abroad_1, topo_adjusted, gas_pipelines_list["geom"]
+        )
+    ]
 
-    for index, row in gas_pipelines_list.iterrows():
-        buses = row["node_id"].strip("][").split(", ")
-
-        if (
-            (boundary != "Everything")
-            & (row["NUTS1_0"] != map_states[boundary])
-            & (row["country_0"] == "DE")
-        ):
-            bus0.append(abroad_gas_nodes_list.loc["DE", "bus_id"])
-            bus1.append(gas_nodes_list.loc[buses[1][1:-1], "bus_id"])
-            long_e = [
-                abroad_gas_nodes_list.loc["DE", "x"],
-                json.loads(row["long"])[1],
-            ]
-            lat_e = [
-                abroad_gas_nodes_list.loc["DE", "y"],
-                json.loads(row["lat"])[1],
-            ]
-            geom_pipe = geometry.MultiLineString(
-                [geometry.LineString(list(zip(long_e, lat_e)))]
-            )
-            topo_adjusted.append(geometry.LineString(list(zip(long_e, lat_e))))
-
-        elif row["country_0"] != "DE":
-            country = str(row["country_0"])
-            bus0.append(abroad_gas_nodes_list.loc[country, "bus_id"])
-            bus1.append(gas_nodes_list.loc[buses[1][1:-1], "bus_id"])
-            long_e = [
-                abroad_gas_nodes_list.loc[country, "x"],
-                json.loads(row["long"])[1],
-            ]
-            lat_e = [
-                abroad_gas_nodes_list.loc[country, "y"],
-                json.loads(row["lat"])[1],
-            ]
-            geom_pipe = geometry.MultiLineString(
-                [geometry.LineString(list(zip(long_e, lat_e)))]
-            )
-            topo_adjusted.append(geometry.LineString(list(zip(long_e, lat_e))))
-
-        elif (
-            (boundary != "Everything")
-            & (row["NUTS1_1"] != map_states[boundary])
-            & (row["country_1"] == "DE")
-        ):
-            bus0.append(gas_nodes_list.loc[buses[0][1:-1], "bus_id"])
-            bus1.append(abroad_gas_nodes_list.loc["DE", "bus_id"])
-            long_e = [
-                json.loads(row["long"])[0],
-                abroad_gas_nodes_list.loc["DE", "x"],
-            ]
-            lat_e = [
-                json.loads(row["lat"])[0],
-                abroad_gas_nodes_list.loc["DE", "y"],
-            ]
-            geom_pipe = geometry.MultiLineString(
-                [geometry.LineString(list(zip(long_e, lat_e)))]
-            )
-            topo_adjusted.append(geometry.LineString(list(zip(long_e, lat_e))))
-
-        elif row["country_1"] != "DE":
-            country = str(row["country_1"])
-            bus0.append(gas_nodes_list.loc[buses[0][1:-1], "bus_id"])
-            bus1.append(abroad_gas_nodes_list.loc[country, "bus_id"])
-            long_e = [
-                json.loads(row["long"])[0],
-                abroad_gas_nodes_list.loc[country, "x"],
-            ]
-            lat_e = [
-                json.loads(row["lat"])[0],
-                abroad_gas_nodes_list.loc[country, "y"],
-            ]
-            geom_pipe = geometry.MultiLineString(
-                [geometry.LineString(list(zip(long_e, lat_e)))]
-            )
-            topo_adjusted.append(geometry.LineString(list(zip(long_e, lat_e))))
-
-        else:
-            bus0.append(gas_nodes_list.loc[buses[0][1:-1], "bus_id"])
-            bus1.append(gas_nodes_list.loc[buses[1][1:-1], "bus_id"])
-            geom_pipe = row["geom"]
-            topo_adjusted.append(row["topo"])
-
-        geom_adjusted.append(geom_pipe)
-        length_adjusted.append(geom_pipe.length)
-
-        if row["diameter"] >= 1000:
-            pipe_class = "A"
-        elif 700 <= row["diameter"] <= 1000:
-            pipe_class = "B"
-        elif 500 <= row["diameter"] <= 700:
-            pipe_class = "C"
-        elif 350 <= row["diameter"] <= 500:
-            pipe_class = "D"
-        elif 200 <= row["diameter"] <= 350:
-            pipe_class = "E"
-        elif 100 <= row["diameter"] <= 200:
-            pipe_class = "F"
-        elif row["diameter"] <= 100:
-            pipe_class = "G"
-
-    gas_pipelines_list["bus0"] = bus0
-    gas_pipelines_list["bus1"] = bus1
     gas_pipelines_list["geom"] = geom_adjusted
     gas_pipelines_list["topo"] = topo_adjusted
-    gas_pipelines_list["length"] = length_adjusted
-    gas_pipelines_list["pipe_class"] = pipe_class
+    gas_pipelines_list["length"] = [geom.length for geom in geom_adjusted]
+
+    # Classify the pipelines by their diameter in mm, the lower bound of
+    # each class is included
+    gas_pipelines_list["pipe_class"] = pd.cut(
+        gas_pipelines_list["diameter"],
+        bins=[-np.inf, 100, 200, 350, 500, 700, 1000, np.inf],
+        labels=["G", "F", "E", "D", "C", "B", "A"],
+        right=False,
+    ).astype(object)
 
     # Remove pipes having the same node for start and end
     gas_pipelines_list = gas_pipelines_list[
@@ -761,26 +699,31 @@ def insert_gas_pipeline_list(
         "max_transport_capacity_Gwh/d"
     ] * (1000 / 24)
 
-    # Remove useless columns
-    gas_pipelines_list = gas_pipelines_list.drop(
-        columns=[
-            "id",
-            "node_id",
-            "param",
-            "NUTS1",
-            "NUTS1_0",
-            "NUTS1_1",
-            "country_code",
-            "country_0",
-            "country_1",
-            "diameter",
-            "pipe_class",
-            "classification",
-            "max_transport_capacity_Gwh/d",
-            "lat",
-            "long",
-            "length_km",
-        ]
+    # Remove useless columns and set the geometry for the export
+    gas_pipelines_list = geopandas.GeoDataFrame(
+        gas_pipelines_list.drop(
+            columns=[
+                "id",
+                "node_id",
+                "param",
+                "path_long",
+                "path_lat",
+                "NUTS1_0",
+                "NUTS1_1",
+                "country_code",
+                "country_0",
+                "country_1",
+                "diameter",
+                "pipe_class",
+                "classification",
+                "max_transport_capacity_Gwh/d",
+                "lat",
+                "long",
+                "length_km",
+            ]
+        ),
+        geometry="geom",
+        crs=4326,
     )
 
     # Clean db
@@ -791,7 +734,6 @@ def insert_gas_pipeline_list(
         """
     )
 
-    print(gas_pipelines_list)
     # Insert data to db
     gas_pipelines_list.to_postgis(
         "egon_etrago_gas_link",
@@ -3,12 +3,8 @@
 Module containing the definition of the open cycle gas turbine links
 """
 from geoalchemy2.types import Geometry
-from scipy.spatial import cKDTree
-import numpy as np
-import pandas as pd
 
 from egon.data import db
-from egon.data.datasets.etrago_setup import link_geom_from_buses
 from egon.data.datasets.scenario_parameters import get_sector_parameters
 
 
@@ -24,14 +20,12 @@ def insert_open_cycle_gas_turbines(scn_name="eGon2035"):
     # Connect to local database
     engine = db.engine()
 
-    # create bus connections
+    # create bus connections including topology column (linestring)
     gdf = map_buses(scn_name)
 
     if gdf is None:
         return
 
-    # create topology column (linestring)
-    gdf = link_geom_from_buses(gdf, scn_name)
     gdf["p_nom_extendable"] = False
     carrier = "OCGT"
     gdf["carrier"] = carrier
@@ -90,42 +84,29 @@ def map_buses(scn_name):
     Returns
     -------
     gdf : geopandas.GeoDataFrame
-        GeoDataFrame with connected buses.
+        GeoDataFrame with connected buses and their topology.
     """
-    # Create dataframes containing all gas buses and all the HV power buses
-    sql_AC = f"""SELECT bus_id, el_capacity as p_nom, geom
-                FROM supply.egon_power_plants
-                WHERE carrier = 'gas' AND scenario = '{scn_name}';
+    # Map each gas power plant to the nearest CH4 bus using the KNN operator
+    # of PostGIS and build the topology from the bus geometries
+    sql = f"""SELECT a.bus_id as bus1, a.el_capacity as p_nom,
+                gas.bus_id as bus0, gas.scn_name,
+                ST_MakeLine(gas.geom, b.geom) as topo
+                FROM supply.egon_power_plants a
+                JOIN grid.egon_etrago_bus b
+                ON a.bus_id = b.bus_id AND b.scn_name = '{scn_name}'
+                CROSS JOIN LATERAL (
+                    SELECT bus_id, scn_name, geom
+                    FROM grid.egon_etrago_bus
+                    WHERE carrier = 'CH4' AND scn_name = '{scn_name}'
+                    AND country = 'DE'
+                    ORDER BY geom <-> a.geom
+                    LIMIT 1
+                ) gas
+                WHERE a.carrier = 'gas' AND a.scenario = '{scn_name}';
                 """
-    sql_gas = f"""SELECT bus_id, scn_name, geom
-                FROM grid.egon_etrago_bus
-                WHERE carrier = 'CH4' AND scn_name = '{scn_name}'
-                AND country = 'DE';"""
 
-    gdf_AC = db.select_geodataframe(sql_AC, epsg=4326)
-    if gdf_AC.size == 0:
+    gdf = db.select_geodataframe(sql, geom_col="topo", epsg=4326)
+    if gdf.size == 0:
         return
 
-    gdf_gas = db.select_geodataframe(sql_gas, epsg=4326)
-
-    # Associate each power plant AC bus to nearest CH4 bus
-    n_gas = np.array(list(gdf_gas.geometry.apply(lambda x: (x.x, x.y))))
-    n_AC = np.array(list(gdf_AC.geometry.apply(lambda x: (x.x, x.y))))
-    btree = cKDTree(n_gas)
-    dist, idx = btree.query(n_AC, k=1)
-    gd_gas_nearest = (
-        gdf_gas.iloc[idx]
-        .rename(columns={"bus_id": "bus0", "geom": "geom_gas"})
-        .reset_index(drop=True)
-    )
-    gdf = pd.concat(
-        [
-            gdf_AC.reset_index(drop=True),
-            gd_gas_nearest,
-        ],
-        axis=1,
-    )
-
-    return gdf.rename(columns={"bus_id": "bus1"}).drop(
-        columns=["geom", "geom_gas"]
-    )
+    return gdf
@@ -1,10 +1,11 @@
 """The central module containing all code dealing with power plant data.
 """
+import functools
+
 from geoalchemy2 import Geometry
 from sqlalchemy import BigInteger, Column, Float, Integer, Sequence, String
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 import geopandas as gpd
 import numpy as np
 import pandas as pd
@@ -16,7 +17,7 @@ from egon.data.datasets.mastr import (
     WORKING_DIR_MASTR_OLD,
 )
 from egon.data.datasets.power_plants.conventional import (
-    match_nep_no_chp,
+    match_nep_no_chp_by_priority,
     select_nep_power_plants,
     select_no_chp_combustion_mastr,
 )
@@ -138,10 +139,9 @@ def scale_prox2now(df, target, level="federal_state"):
 
     if level == "federal_state":
         df.loc[:, "Nettonennleistung"] = (
-            df.groupby(df.Bundesland)
-            .Nettonennleistung.apply(lambda grp: grp / grp.sum())
-            .mul(target[df.Bundesland.values].values)
-        )
+            df.Nettonennleistung
+            / df.groupby(df.Bundesland).Nettonennleistung.transform("sum")
+        ).mul(target[df.Bundesland.values].values)
     else:
         df.loc[:, "Nettonennleistung"] = df.Nettonennleistung.apply(
             lambda x: x / x.sum()
@@ -189,6 +189,28 @@ def select_target(carrier, scenario):
     )
 
 
+@functools.lru_cache(maxsize=None)
+def federal_states():
+    """Select names of all federal states in the format used by MaStR
+
+    The list is static during a run, so it is only queried once.
+
+    Returns
+    -------
+    numpy.ndarray
+        Names of federal states without hyphens and umlauts
+
+    """
+    cfg = egon.data.config.datasets()["power_plants"]
+
+    return pd.read_sql(
+        f"""SELECT DISTINCT ON (gen)
+        REPLACE(REPLACE(gen, '-', ''), 'ü', 'ue') as states
+        FROM {cfg['sources']['geom_federal_states']}""",
+        con=db.engine(),
+    ).states.values
+
+
 def filter_mastr_geometry(mastr, federal_state=None):
     """Filter data from MaStR by geometry
 
@@ -233,26 +255,115 @@ def filter_mastr_geometry(mastr, federal_state=None):
         FROM boundaries.vg250_lan_union
         WHERE REPLACE(REPLACE(gen, '-', ''), 'ü', 'ue') = '{federal_state}'"""
 
-    mastr_loc = (
+    boundary = gpd.read_postgis(sql, con=db.engine())
+
+    # Transform the points instead of the far more complex boundary polygons
+    # to the CRS of the boundary to perform the spatial join
+    inside = (
         gpd.sjoin(
-            gpd.read_postgis(sql, con=db.engine()).to_crs(4326),
-            mastr_loc,
+            boundary,
+            mastr_loc[[mastr_loc.geometry.name]].to_crs(boundary.crs),
             how="right",
+            predicate="intersects",
         )
         .query("index_left==0")
-        .drop("index_left", axis=1)
+        .index
     )
 
+    mastr_loc = mastr_loc[mastr_loc.index.isin(inside)]
+
     return mastr_loc
 
 
-def insert_biomass_plants(scenario):
+def write_table_with_sequence_ids(units, schema, table, sequence, con):
+    """Append units to a target table in one bulk insert
+
+    Ids are drawn from the given sequence, so entries written here do not
+    collide with entries inserted via the ORM. Drawing the ids and inserting
+    the units use the same connection, pass a connection from
+    ``engine.begin()`` to run both in one transaction.
+
+    Parameters
+    ----------
+    units : geopandas.GeoDataFrame
+        Units with all columns of the target table except 'id', 'sources'
+        and 'source_id' as dicts and point geometries in EPSG:4326
+    schema : str
+        Schema of the target table
+    table : str
+        Name of the target table
+    sequence : str
+        Name of the sequence of the target table's 'id' column
+    con : sqlalchemy.engine.Engine or sqlalchemy.engine.Connection
+        Database connection used for the insert
+
+    Returns
+    -------
+    None.
+
+    """
+    if len(units) == 0:
+        return
+
+    ids = pd.read_sql(
+        f"""SELECT nextval('{sequence}') AS id
+        FROM generate_series(1, {len(units)})""",
+        con=con,
+    ).id.values
+
+    units = (
+        units.rename_geometry("geom")
+        .set_index(pd.Index(ids, name="id"))
+        .reset_index()
+    )
+
+    units.to_postgis(
+        table,
+        schema=schema,
+        con=con,
+        if_exists="append",
+        index=False,
+        dtype={"sources": JSONB, "source_id": JSONB},
+    )
+
+
+def write_power_plants_table(power_plants, con):
+    """Append power plants to the target table in one bulk insert
+
+    Parameters
+    ----------
+    power_plants : geopandas.GeoDataFrame
+        Power plants with columns of :class:`EgonPowerPlants` except 'id'
+        and point geometries in EPSG:4326
+    con : sqlalchemy.engine.Engine or sqlalchemy.engine.Connection
+        Database connection used for the insert
+
+    Returns
+    -------
+    None.
+
+    """
+    cfg = egon.data.config.datasets()["power_plants"]
+
+    write_table_with_sequence_ids(
+        power_plants,
+        cfg["target"]["schema"],
+        cfg["target"]["table"],
+        "pp_seq",
+        con,
+    )
+
+
+def insert_biomass_plants(scenario, con=None):
     """Insert biomass power plants of future scenario
 
     Parameters
     ----------
     scenario : str
         Name of scenario.
+    con : sqlalchemy.engine.Engine or sqlalchemy.engine.Connection, optional
+        Database connection shared with other tasks. The default is None,
+        which uses the engine of the local database.
 
     Returns
     -------
@@ -261,6 +372,9 @@ def insert_biomass_plants(scenario):
     """
     cfg = egon.data.config.datasets()["power_plants"]
 
+    if con is None:
+        con = db.engine()
+
     # import target values from NEP 2021, scneario C 2035
     target = select_target("biomass", scenario)
 
@@ -270,16 +384,7 @@ def insert_biomass_plants(scenario):
     ).query("EinheitBetriebsstatus=='InBetrieb'")
 
     # Drop entries without federal state or 'AusschließlichWirtschaftszone'
-    mastr = mastr[
-        mastr.Bundesland.isin(
-            pd.read_sql(
-                f"""SELECT DISTINCT ON (gen)
-        REPLACE(REPLACE(gen, '-', ''), 'ü', 'ue') as states
-        FROM {cfg['sources']['geom_federal_states']}""",
-                con=db.engine(),
-            ).states.values
-        )
-    ]
+    mastr = mastr[mastr.Bundesland.isin(federal_states())]
 
     # Scaling will be done per federal state in case of eGon2035 scenario.
     if scenario == "eGon2035":
@@ -301,26 +406,31 @@ def insert_biomass_plants(scenario):
         mastr_loc = assign_bus_id(mastr_loc, cfg)
 
     # Insert entries with location
-    session = sessionmaker(bind=db.engine())()
-
-    for i, row in mastr_loc.iterrows():
-        if not row.ThermischeNutzleistung > 0:
-            entry = EgonPowerPlants(
-                sources={"el_capacity": "MaStR scaled with NEP 2021"},
-                source_id={"MastrNummer": row.EinheitMastrNummer},
-                carrier="biomass",
-                el_capacity=row.Nettonennleistung,
-                scenario=scenario,
-                bus_id=row.bus_id,
-                voltage_level=row.voltage_level,
-                geom=f"SRID=4326;POINT({row.Laengengrad} {row.Breitengrad})",
-            )
-            session.add(entry)
-
-    session.commit()
+    mastr_loc = mastr_loc[~(mastr_loc.ThermischeNutzleistung > 0)]
+
+    write_power_plants_table(
+        gpd.GeoDataFrame(
+            {
+                "sources": [{"el_capacity": "MaStR scaled with NEP 2021"}]
+                * len(mastr_loc),
+                "source_id": [
+                    {"MastrNummer": nr} for nr in mastr_loc.EinheitMastrNummer
+                ],
+                "carrier": "biomass",
+                "el_capacity": mastr_loc.Nettonennleistung.values,
+                "scenario": scenario,
+                "bus_id": mastr_loc.bus_id.values,
+                "voltage_level": mastr_loc.voltage_level.values,
+            },
+            geometry=gpd.points_from_xy(
+                mastr_loc.Laengengrad, mastr_loc.Breitengrad, crs=4326
+            ),
+        ),
+        con=con,
+    )
 
 
-def insert_hydro_plants(scenario):
+def insert_hydro_plants(scenario, con=None):
     """Insert hydro power plants of future scenario.
 
     Hydro power plants are diveded into run_of_river and reservoir plants
@@ -332,6 +442,9 @@ def insert_hydro_plants(scenario):
     ----------
     scenario : str
         Name of scenario.
+    con : sqlalchemy.engine.Engine or sqlalchemy.engine.Connection, optional
+        Database connection shared with other tasks. The default is None,
+        which uses the engine of the local database.
 
     Returns
     -------
@@ -340,6 +453,9 @@ def insert_hydro_plants(scenario):
     """
     cfg = egon.data.config.datasets()["power_plants"]
 
+    if con is None:
+        con = db.engine()
+
     # Map MaStR carriers to eGon carriers
     map_carrier = {
         "run_of_river": ["Laufwasseranlage"],
@@ -360,16 +476,7 @@ def insert_hydro_plants(scenario):
         mastr = mastr[mastr.ArtDerWasserkraftanlage.isin(map_carrier[carrier])]
 
         # Drop entries without federal state or 'AusschließlichWirtschaftszone'
-        mastr = mastr[
-            mastr.Bundesland.isin(
-                pd.read_sql(
-                    f"""SELECT DISTINCT ON (gen)
-            REPLACE(REPLACE(gen, '-', ''), 'ü', 'ue') as states
-            FROM {cfg['sources']['geom_federal_states']}""",
-                    con=db.engine(),
-                ).states.values
-            )
-        ]
+        mastr = mastr[mastr.Bundesland.isin(federal_states())]
 
         # Scaling will be done per federal state in case of eGon2035 scenario.
         if scenario == "eGon2035":
@@ -392,21 +499,27 @@ def insert_hydro_plants(scenario):
             mastr_loc = assign_bus_id(mastr_loc, cfg)
 
         # Insert entries with location
-        session = sessionmaker(bind=db.engine())()
-        for i, row in mastr_loc.iterrows():
-            entry = EgonPowerPlants(
-                sources={"el_capacity": "MaStR scaled with NEP 2021"},
-                source_id={"MastrNummer": row.EinheitMastrNummer},
-                carrier=carrier,
-                el_capacity=row.Nettonennleistung,
-                scenario=scenario,
-                bus_id=row.bus_id,
-                voltage_level=row.voltage_level,
-                geom=f"SRID=4326;POINT({row.Laengengrad} {row.Breitengrad})",
-            )
-            session.add(entry)
-
-        session.commit()
+        write_power_plants_table(
+            gpd.GeoDataFrame(
+                {
+                    "sources": [{"el_capacity": "MaStR scaled with NEP 2021"}]
+                    * len(mastr_loc),
+                    "source_id": [
+                        {"MastrNummer": nr}
+                        for nr in mastr_loc.EinheitMastrNummer
+                    ],
+                    "carrier": carrier,
+                    "el_capacity": mastr_loc.Nettonennleistung.values,
+                    "scenario": scenario,
+                    "bus_id": mastr_loc.bus_id.values,
+                    "voltage_level": mastr_loc.voltage_level.values,
+                },
+                geometry=gpd.points_from_xy(
+                    mastr_loc.Laengengrad, mastr_loc.Breitengrad, crs=4326
+                ),
+            ),
+            con=con,
+        )
 
 
 def assign_voltage_level(mastr_loc, cfg, mastr_working_dir):
@@ -501,22 +614,19 @@ def assign_voltage_level(mastr_loc, cfg, mastr_working_dir):
 
 def assign_voltage_level_by_capacity(mastr_loc):
 
-    for i, row in mastr_loc[mastr_loc.voltage_level.isnull()].iterrows():
-
-        if row.Nettonennleistung > 120:
-            level = 1
-        elif row.Nettonennleistung > 20:
-            level = 3
-        elif row.Nettonennleistung > 5.5:
-            level = 4
-        elif row.Nettonennleistung > 0.2:
-            level = 5
-        elif row.Nettonennleistung > 0.1:
-            level = 6
-        else:
-            level = 7
+    # Upper capacity thresholds in MW and the voltage level assigned to
+    # capacities up to (and including) each threshold
+    thresholds = np.array([0.1, 0.2, 5.5, 20, 120])
+    levels = np.array([7, 6, 5, 4, 3, 1])
+
+    missing = mastr_loc.voltage_level.isnull()
 
-        mastr_loc.loc[i, "voltage_level"] = level
+    mastr_loc.loc[missing, "voltage_level"] = levels[
+        np.searchsorted(
+            thresholds,
+            mastr_loc.loc[missing, "Nettonennleistung"].fillna(0).values,
+        )
+    ]
 
     mastr_loc.voltage_level = mastr_loc.voltage_level.astype(int)
 
@@ -540,14 +650,14 @@ def assign_bus_id(power_plants, cfg):
 
     mv_grid_districts = db.select_geodataframe(
         f"""
-        SELECT * FROM {cfg['sources']['egon_mv_grid_district']}
+        SELECT bus_id, geom FROM {cfg['sources']['egon_mv_grid_district']}
         """,
         epsg=4326,
     )
 
     ehv_grid_districts = db.select_geodataframe(
         f"""
-        SELECT * FROM {cfg['sources']['ehv_voronoi']}
+        SELECT bus_id, geom FROM {cfg['sources']['ehv_voronoi']}
         """,
         epsg=4326,
     )
@@ -557,7 +667,8 @@ def assign_bus_id(power_plants, cfg):
     if len(power_plants_hv) > 0:
         power_plants.loc[power_plants_hv, "bus_id"] = gpd.sjoin(
             power_plants[power_plants.index.isin(power_plants_hv)],
-            mv_grid_districts,
+            mv_grid_districts[["bus_id", "geom"]],
+            predicate="intersects",
         ).bus_id
 
     # Assign power plants in ehv to ehv bus
@@ -566,20 +677,17 @@ def assign_bus_id(power_plants, cfg):
     if len(power_plants_ehv) > 0:
         ehv_join = gpd.sjoin(
             power_plants[power_plants.index.isin(power_plants_ehv)],
-            ehv_grid_districts,
+            ehv_grid_districts[["bus_id", "geom"]],
+            predicate="intersects",
         )
 
         if "bus_id_right" in ehv_join.columns:
-            power_plants.loc[power_plants_ehv, "bus_id"] = gpd.sjoin(
-                power_plants[power_plants.index.isin(power_plants_ehv)],
-                ehv_grid_districts,
-            ).bus_id_right
+            power_plants.loc[
+                power_plants_ehv, "bus_id"
+            ] = ehv_join.bus_id_right
 
         else:
-            power_plants.loc[power_plants_ehv, "bus_id"] = gpd.sjoin(
-                power_plants[power_plants.index.isin(power_plants_ehv)],
-                ehv_grid_districts,
-            ).bus_id
+            power_plants.loc[power_plants_ehv, "bus_id"] = ehv_join.bus_id
 
     # Assert that all power plants have a bus_id
     assert power_plants.bus_id.notnull().all(), f"""Some power plants are
@@ -597,16 +705,19 @@ def insert_hydro_biomass():
 
     """
     cfg = egon.data.config.datasets()["power_plants"]
-    db.execute_sql(
-        f"""
-        DELETE FROM {cfg['target']['schema']}.{cfg['target']['table']}
-        WHERE carrier IN ('biomass', 'reservoir', 'run_of_river')
-        """
-    )
 
-    for scenario in ["eGon2035"]:
-        insert_biomass_plants(scenario)
-        insert_hydro_plants(scenario)
+    # Replace the existing plants using one connection for all carriers
+    with db.engine().begin() as con:
+        con.execute(
+            f"""
+            DELETE FROM {cfg['target']['schema']}.{cfg['target']['table']}
+            WHERE carrier IN ('biomass', 'reservoir', 'run_of_river')
+            """
+        )
+
+        for scenario in ["eGon2035"]:
+            insert_biomass_plants(scenario, con=con)
+            insert_hydro_plants(scenario, con=con)
 
 
 def allocate_conventional_non_chp_power_plants():
@@ -624,6 +735,26 @@ def allocate_conventional_non_chp_power_plants():
          """
     )
 
+    # Load grid district polygons in a metric CRS once for all carriers,
+    # the frames are passed to the spatial joins as they are so that their
+    # spatial indexes are only built once
+    mv_grid_districts = db.select_geodataframe(
+        f"""
+        SELECT bus_id, geom FROM {cfg['sources']['egon_mv_grid_district']}
+        """,
+        epsg=3035,
+    )
+
+    ehv_grid_districts = db.select_geodataframe(
+        f"""
+        SELECT bus_id, geom FROM {cfg['sources']['ehv_voronoi']}
+        """,
+        epsg=3035,
+    )
+
+    # Allocated plants of each carrier
+    allocated = []
+
     for carrier in carrier:
 
         nep = select_nep_power_plants(carrier)
@@ -655,66 +786,33 @@ def allocate_conventional_non_chp_power_plants():
                 ]
             )
 
-            # Match combustion plants of a certain carrier from NEP list
-            # using PLZ and capacity
-            matched, mastr, nep = match_nep_no_chp(
-                nep,
-                mastr,
-                matched,
-                buffer_capacity=0.1,
-                consider_carrier=False,
-            )
-
-            # Match plants from NEP list using city and capacity
-            matched, mastr, nep = match_nep_no_chp(
-                nep,
-                mastr,
-                matched,
-                buffer_capacity=0.1,
-                consider_carrier=False,
-                consider_location="city",
-            )
-
-            # Match plants from NEP list using plz,
-            # neglecting the capacity
-            matched, mastr, nep = match_nep_no_chp(
-                nep,
-                mastr,
-                matched,
-                consider_location="plz",
-                consider_carrier=False,
-                consider_capacity=False,
-            )
-
-            # Match plants from NEP list using city,
-            # neglecting the capacity
-            matched, mastr, nep = match_nep_no_chp(
-                nep,
-                mastr,
-                matched,
-                consider_location="city",
-                consider_carrier=False,
-                consider_capacity=False,
-            )
-
-            # Match remaining plants from NEP using the federal state
-            matched, mastr, nep = match_nep_no_chp(
-                nep,
-                mastr,
-                matched,
-                buffer_capacity=0.1,
-                consider_location="federal_state",
-                consider_carrier=False,
-            )
-
-            # Match remaining plants from NEP using the federal state
-            matched, mastr, nep = match_nep_no_chp(
+            # Match combustion plants of a certain carrier from NEP list,
+            # each plant is matched in the first of the following steps
+            # which finds a plant from MaStR
+            matched, nep = match_nep_no_chp_by_priority(
                 nep,
                 mastr,
                 matched,
-                buffer_capacity=0.7,
-                consider_location="federal_state",
-                consider_carrier=False,
+                steps=[
+                    # Using PLZ and capacity
+                    dict(buffer_capacity=0.1, consider_location="plz"),
+                    # Using city and capacity
+                    dict(buffer_capacity=0.1, consider_location="city"),
+                    # Using plz, neglecting the capacity
+                    dict(consider_location="plz", consider_capacity=False),
+                    # Using city, neglecting the capacity
+                    dict(consider_location="city", consider_capacity=False),
+                    # Using the federal state
+                    dict(
+                        buffer_capacity=0.1,
+                        consider_location="federal_state",
+                    ),
+                    # Using the federal state and a larger buffer
+                    dict(
+                        buffer_capacity=0.7,
+                        consider_location="federal_state",
+                    ),
+                ],
             )
 
             print(f"{matched.el_capacity.sum()} MW of {carrier} matched")
@@ -723,51 +821,59 @@ def allocate_conventional_non_chp_power_plants():
             matched.crs = "EPSG:4326"
 
             # Assign bus_id
-            # Load grid district polygons
-            mv_grid_districts = db.select_geodataframe(
-                f"""
-            SELECT * FROM {cfg['sources']['egon_mv_grid_district']}
-            """,
-                epsg=4326,
+            # Perform spatial joins for plants in ehv and hv level seperately
+            # on projected copies of the plants
+            matched = matched.reset_index(drop=True)
+            matched_3035 = matched.to_crs(3035)
+
+            bus_ids = pd.concat(
+                [
+                    gpd.sjoin(
+                        matched_3035[matched_3035.voltage_level >= 3],
+                        mv_grid_districts,
+                        how="left",
+                        predicate="intersects",
+                    ).bus_id,
+                    gpd.sjoin(
+                        matched_3035[matched_3035.voltage_level < 3],
+                        ehv_grid_districts,
+                        how="left",
+                        predicate="intersects",
+                    ).bus_id,
+                ]
             )
 
-            ehv_grid_districts = db.select_geodataframe(
-                f"""
-            SELECT * FROM {cfg['sources']['ehv_voronoi']}
-            """,
-                epsg=4326,
+            # Combine both dataframes
+            allocated.append(
+                matched.loc[bus_ids.index].assign(bus_id=bus_ids.values)
             )
 
-            # Perform spatial joins for plants in ehv and hv level seperately
-            power_plants_hv = gpd.sjoin(
-                matched[matched.voltage_level >= 3],
-                mv_grid_districts[["bus_id", "geom"]],
-                how="left",
-            ).drop(columns=["index_right"])
-            power_plants_ehv = gpd.sjoin(
-                matched[matched.voltage_level < 3],
-                ehv_grid_districts[["bus_id", "geom"]],
-                how="left",
-            ).drop(columns=["index_right"])
-
-            # Combine both dataframes
-            power_plants = pd.concat([power_plants_hv, power_plants_ehv])
-
-            # Insert into target table
-            session = sessionmaker(bind=db.engine())()
-            for i, row in power_plants.iterrows():
-                entry = EgonPowerPlants(
-                    sources={"el_capacity": row.source},
-                    source_id={"MastrNummer": row.MaStRNummer},
-                    carrier=row.carrier,
-                    el_capacity=row.el_capacity,
-                    voltage_level=row.voltage_level,
-                    bus_id=row.bus_id,
-                    scenario=row.scenario,
-                    geom=f"SRID=4326;POINT({row.geometry.x} {row.geometry.y})",
-                )
-                session.add(entry)
-            session.commit()
+    if not allocated:
+        return
+
+    power_plants = pd.concat(allocated, ignore_index=True)
+
+    # Insert plants of all carriers into target table at once
+    write_power_plants_table(
+        gpd.GeoDataFrame(
+            {
+                "sources": [
+                    {"el_capacity": source} for source in power_plants.source
+                ],
+                "source_id": [
+                    {"MastrNummer": nr} for nr in power_plants.MaStRNummer
+                ],
+                "carrier": power_plants.carrier.values,
+                "el_capacity": power_plants.el_capacity.values,
+                "voltage_level": power_plants.voltage_level.values,
+                "bus_id": power_plants.bus_id.values,
+                "scenario": power_plants.scenario.values,
+            },
+            geometry=power_plants.geometry.values,
+            crs=4326,
+        ),
+        con=db.engine(),
+    )
 
 
 def allocate_other_power_plants():
@@ -917,17 +1023,21 @@ def allocate_other_power_plants():
     mastr_prox = mastr_prox.set_crs(4326, allow_override=True)
 
     # Insert into target table
-    session = sessionmaker(bind=db.engine())()
-    for i, row in mastr_prox.iterrows():
-        entry = EgonPowerPlants(
-            sources=row.el_capacity,
-            source_id={"MastrNummer": row.EinheitMastrNummer},
-            carrier=row.carrier,
-            el_capacity=row.el_capacity,
-            voltage_level=row.voltage_level,
-            bus_id=row.bus_id,
-            scenario=scenario,
-            geom=f"SRID=4326; {row.geometry}",
-        )
-        session.add(entry)
-    session.commit()
+    write_power_plants_table(
+        gpd.GeoDataFrame(
+            {
+                "sources": mastr_prox.el_capacity.values,
+                "source_id": [
+                    {"MastrNummer": nr} for nr in mastr_prox.EinheitMastrNummer
+                ],
+                "carrier": mastr_prox.carrier.values,
+                "el_capacity": mastr_prox.el_capacity.values,
+                "voltage_level": mastr_prox.voltage_level.values,
+                "bus_id": mastr_prox.bus_id.values,
+                "scenario": scenario,
+            },
+            geometry=mastr_prox.geometry.values,
+            crs=4326,
+        ),
+        con=db.engine(),
+    )
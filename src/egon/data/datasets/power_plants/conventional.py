@@ -3,13 +3,36 @@ The module containing all code allocating power plants of different
 conventional technologies (oil, gas, others) based on data from MaStR and NEP.
 """
 
+from sqlalchemy import text
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 
 from egon.data import db
 import egon.data.config
 
 
+# Abbreviations of the federal states used in the NEP list of power plants
+FEDERAL_STATE_CODES = {
+    "Hamburg": "HH",
+    "Sachsen": "SN",
+    "MecklenburgVorpommern": "MV",
+    "Thueringen": "TH",
+    "SchleswigHolstein": "SH",
+    "Bremen": "HB",
+    "Saarland": "SL",
+    "Bayern": "BY",
+    "BadenWuerttemberg": "BW",
+    "Brandenburg": "BB",
+    "Hessen": "HE",
+    "NordrheinWestfalen": "NW",
+    "Berlin": "BE",
+    "Niedersachsen": "NI",
+    "SachsenAnhalt": "ST",
+    "RheinlandPfalz": "RP",
+}
+
+
 def select_nep_power_plants(carrier):
     """Select power plants with location from NEP's list of power plants
 
@@ -26,29 +49,28 @@ def select_nep_power_plants(carrier):
     """
     cfg = egon.data.config.datasets()["power_plants"]
 
-    # Select plants with geolocation from list of conventional power plants
+    # Select plants with geolocation from list of conventional power plants,
+    # the subunits are removed from the bnetza_id
     nep = db.select_dataframe(
-        f"""
-        SELECT bnetza_id, name, carrier, capacity, postcode, city,
-        federal_state, c2035_capacity
-        FROM {cfg['sources']['nep_conv']}
-        WHERE carrier = '{carrier}'
-        AND chp = 'Nein'
-        AND c2035_chp = 'Nein'
-        AND c2035_capacity > 0
-        AND postcode != 'None';
-        """
+        text(
+            f"""
+            SELECT LEFT(bnetza_id, 7) as bnetza_id, name, carrier, capacity,
+            postcode, city, federal_state, c2035_capacity
+            FROM {cfg['sources']['nep_conv']}
+            WHERE carrier = :carrier
+            AND chp = 'Nein'
+            AND c2035_chp = 'Nein'
+            AND c2035_capacity > 0
+            AND postcode != 'None'
+            -- Removing plants out of Germany
+            AND postcode NOT LIKE '%A%'
+            AND postcode NOT LIKE '%L%'
+            AND postcode NOT LIKE '%nan%';
+            """
+        ),
+        params={"carrier": carrier},
     )
 
-    # Removing plants out of Germany
-    nep["postcode"] = nep["postcode"].astype(str)
-    nep = nep[~nep["postcode"].str.contains("A")]
-    nep = nep[~nep["postcode"].str.contains("L")]
-    nep = nep[~nep["postcode"].str.contains("nan")]
-
-    # Remove the subunits from the bnetza_id
-    nep["bnetza_id"] = nep["bnetza_id"].str[0:7]
-
     return nep
 
 
@@ -75,7 +97,7 @@ def select_no_chp_combustion_mastr(carrier):
                 el_capacity,
                 ST_setSRID(geometry, 4326) as geometry,
                 carrier,
-                plz,
+                plz::text as plz,
                 city,
                 federal_state
             FROM {cfg['sources']['mastr_combustion_without_chp']}
@@ -89,16 +111,15 @@ def select_no_chp_combustion_mastr(carrier):
     return mastr
 
 
-def match_nep_no_chp(
+def select_match_candidates(
     nep,
     mastr,
-    matched,
     buffer_capacity=0.1,
     consider_location="plz",
     consider_carrier=True,
     consider_capacity=True,
 ):
-    """Match Power plants (no CHP) from MaStR to list of power plants from NEP
+    """Select pairs of power plants from NEP and MaStR which can be matched
 
     Parameters
     ----------
@@ -106,111 +127,188 @@ def match_nep_no_chp(
         Power plants (no CHP) from NEP which are not matched to MaStR
     mastr : pandas.DataFrame
         Power plants (no CHP) from MaStR which are not matched to NEP
-    matched : pandas.DataFrame
-        Already matched power plants
     buffer_capacity : float, optional
         Maximum difference in capacity in p.u. The default is 0.1.
 
+    Returns
+    -------
+    candidates : pandas.DataFrame
+        Candidate pairs sorted by carrier and position in both lists
+
+    """
+
+    # Select NEP plants which can be matched and the keys of both lists
+    # according to the geographic constraint, either power plants with the
+    # same postcode, city or federal state are matched
+    nep_loc = nep[nep["postcode"] != "None"]
+
+    # Skip plants from MaStR whose capacity is not inside the buffer of any
+    # plant from NEP, the NEP plants covering a capacity are looked up in
+    # the sorted NEP capacities with bounds widened against rounding errors
+    mastr_loc = mastr
+    if consider_capacity & (buffer_capacity < 1):
+        capacities = np.sort(nep_loc.capacity.values)
+        mastr_loc = mastr[
+            np.searchsorted(
+                capacities,
+                mastr.el_capacity.values / (1 + buffer_capacity) * (1 - 1e-9),
+                side="left",
+            )
+            < np.searchsorted(
+                capacities,
+                mastr.el_capacity.values / (1 - buffer_capacity) * (1 + 1e-9),
+                side="right",
+            )
+        ]
+
+    if consider_location == "plz":
+        nep_key = nep_loc["postcode"].values
+        mastr_key = mastr_loc.plz.values
+    elif consider_location == "city":
+        nep_key = nep_loc.city.str.replace("\n", " ").values
+        mastr_key = mastr_loc.city.values
+    elif consider_location == "federal_state":
+        nep_key = nep_loc.federal_state.values
+        mastr_key = mastr_loc.federal_state.map(FEDERAL_STATE_CODES).values
+    else:
+        nep_key = 0
+        mastr_key = 0
+
+    # Join all plants from MaStR to the NEP plants at the same location,
+    # plants without a location are never matched, candidates are sorted by
+    # carrier and position in both lists
+    candidates = pd.merge(
+        pd.DataFrame(
+            {
+                "nep_index": nep_loc.index,
+                "carrier_order": pd.Categorical(
+                    nep_loc.carrier, categories=nep["carrier"].unique()
+                ).codes,
+                "nep_order": np.arange(len(nep_loc)),
+                "key": nep_key,
+                "capacity": nep_loc.capacity.values,
+                "carrier": nep_loc.carrier.values,
+                "c2035_capacity": nep_loc.c2035_capacity.values,
+            }
+        ).dropna(subset=["key"]),
+        pd.DataFrame(
+            {
+                "mastr_index": mastr_loc.index,
+                "mastr_order": np.arange(len(mastr_loc)),
+                "key": mastr_key,
+                "el_capacity": mastr_loc.el_capacity.values,
+                "mastr_carrier": mastr_loc.carrier.values,
+            }
+        ).dropna(subset=["key"]),
+        on="key",
+    ).sort_values(["carrier_order", "nep_order", "mastr_order"])
+
+    # Set capacity constraint using buffer
+    if consider_capacity:
+        candidates = candidates[
+            (
+                candidates.el_capacity
+                <= candidates.capacity * (1 + buffer_capacity)
+            )
+            & (
+                candidates.el_capacity
+                >= candidates.capacity * (1 - buffer_capacity)
+            )
+        ]
+
+    # Set carrier constraint if selected
+    if consider_carrier:
+        candidates = candidates[candidates.mastr_carrier == candidates.carrier]
+
+    return candidates
+
+
+def add_matched_plants(matched, mastr, selected):
+    """Add pairs of matched power plants to the already matched power plants
+
+    Parameters
+    ----------
+    matched : pandas.DataFrame
+        Already matched power plants
+    mastr : pandas.DataFrame
+        Power plants (no CHP) from MaStR
+    selected : pandas.DataFrame
+        Selected candidates from select_match_candidates
+
     Returns
     -------
     matched : pandas.DataFrame
-        Matched CHP
+        Matched power plants including the selected ones
+
+    """
+    mastr_selected = mastr.loc[selected.mastr_index]
+
+    return pd.concat(
+        [
+            matched,
+            gpd.GeoDataFrame(
+                data={
+                    "source": "MaStR scaled with NEP 2021 list",
+                    "MaStRNummer": mastr_selected.EinheitMastrNummer.values,
+                    "carrier": selected.carrier.values,
+                    "el_capacity": selected.c2035_capacity.values,
+                    "scenario": "eGon2035",
+                    "geometry": mastr_selected.geometry.values,
+                    "voltage_level": mastr_selected.voltage_level.values,
+                },
+                index=mastr_selected.index,
+            ),
+        ]
+    )
+
+
+def match_nep_no_chp_by_priority(nep, mastr, matched, steps):
+    """Match power plants (no CHP) from MaStR to NEP in several steps at once
+
+    Each NEP plant is matched to the first plant from MaStR in the first step
+    in which any plant fulfills the constraints, later steps are only used
+    for NEP plants without a match. The carrier is not considered. Plants
+    from MaStR are not dropped after a match and can therefore be matched to
+    several NEP plants.
+
+    Parameters
+    ----------
+    nep : pandas.DataFrame
+        Power plants (no CHP) from NEP which are not matched to MaStR
     mastr : pandas.DataFrame
-        CHP plants from MaStR which are not matched to NEP
+        Power plants (no CHP) from MaStR which are not matched to NEP
+    matched : pandas.DataFrame
+        Already matched power plants
+    steps : list of dict
+        Keyword arguments of select_match_candidates for each step sorted by
+        priority, except for consider_carrier
+
+    Returns
+    -------
+    matched : pandas.DataFrame
+        Matched power plants
     nep : pandas.DataFrame
-        CHP plants from NEP which are not matched to MaStR
+        Power plants from NEP which are not matched to MaStR
 
     """
 
-    list_federal_states = pd.Series(
-        {
-            "Hamburg": "HH",
-            "Sachsen": "SN",
-            "MecklenburgVorpommern": "MV",
-            "Thueringen": "TH",
-            "SchleswigHolstein": "SH",
-            "Bremen": "HB",
-            "Saarland": "SL",
-            "Bayern": "BY",
-            "BadenWuerttemberg": "BW",
-            "Brandenburg": "BB",
-            "Hessen": "HE",
-            "NordrheinWestfalen": "NW",
-            "Berlin": "BE",
-            "Niedersachsen": "NI",
-            "SachsenAnhalt": "ST",
-            "RheinlandPfalz": "RP",
-        }
+    candidates = pd.concat(
+        [
+            select_match_candidates(
+                nep, mastr, consider_carrier=False, **step
+            ).assign(priority=priority)
+            for priority, step in enumerate(steps)
+        ]
     )
 
-    for ET in nep["carrier"].unique():
-
-        for index, row in nep[
-            (nep["carrier"] == ET) & (nep["postcode"] != "None")
-        ].iterrows():
-
-            # Select plants from MaStR that match carrier, PLZ
-            # and have a similar capacity
-            # Create a copy of all power plants from MaStR
-            selected = mastr.copy()
-
-            # Set capacity constraint using buffer
-            if consider_capacity:
-                selected = selected[
-                    (
-                        selected.el_capacity
-                        <= row["capacity"] * (1 + buffer_capacity)
-                    )
-                    & (
-                        selected.el_capacity
-                        >= row["capacity"] * (1 - buffer_capacity)
-                    )
-                ]
-
-            # Set geographic constraint, either choose power plants
-            # with the same postcode, city or federal state
-            if consider_location == "plz":
-                selected = selected[
-                    selected.plz.astype(int).astype(str) == row["postcode"]
-                ]
-            elif consider_location == "city":
-                selected = selected[
-                    selected.city == row.city.replace("\n", " ")
-                ]
-            elif consider_location == "federal_state":
-                selected.loc[:, "federal_state"] = list_federal_states[
-                    selected.federal_state
-                ].values
-                selected = selected[
-                    selected.federal_state == row.federal_state
-                ]
-
-            # Set capacity constraint if selected
-            if consider_carrier:
-                selected = selected[selected.carrier == ET]
-
-            # If a plant could be matched, add this to matched
-            if len(selected) > 0:
-                matched = matched.append(
-                    gpd.GeoDataFrame(
-                        data={
-                            "source": "MaStR scaled with NEP 2021 list",
-                            "MaStRNummer": selected.EinheitMastrNummer.head(1),
-                            "carrier": ET,
-                            "el_capacity": row.c2035_capacity,
-                            "scenario": "eGon2035",
-                            "geometry": selected.geometry.head(1),
-                            "voltage_level": selected.voltage_level.head(1),
-                        }
-                    )
-                )
-
-                # Drop matched power plant from nep
-                nep = nep.drop(index)
-
-                # Drop matched powerplant from MaStR list if the location is
-                # accurate
-                if consider_capacity & consider_carrier:
-                    mastr = mastr.drop(selected.index)
-
-    return matched, mastr, nep
+    # Select the first plant from MaStR of the step with the highest
+    # priority for each NEP plant
+    selected = candidates.sort_values(
+        ["priority", "carrier_order", "nep_order", "mastr_order"]
+    ).drop_duplicates("nep_index")
+
+    matched = add_matched_plants(matched, mastr, selected)
+
+    nep = nep.drop(selected.nep_index)
+
+    return matched, nep
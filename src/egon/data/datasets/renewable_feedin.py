@@ -20,7 +20,7 @@ class RenewableFeedin(Dataset):
     def __init__(self, dependencies):
         super().__init__(
             name="RenewableFeedin",
-            version="0.0.7",
+            version="0.0.8",
             dependencies=dependencies,
             tasks={
                 wind,
@@ -97,12 +97,42 @@ def offshore_weather_cells(geom_column="geom"):
     )
 
 
+def intersecting_index(left, right):
+    """Get the index of an intersecting geometry in right for each left one
+
+    Queries the spatial index of `right` directly instead of running a
+    full spatial join. Geometries intersecting several geometries of
+    `right` are assigned to the first match.
+
+    Parameters
+    ----------
+    left : GeoPandas.GeoDataFrame
+        Geometries to be assigned
+    right : GeoPandas.GeoDataFrame
+        Geometries to assign to
+
+    Returns
+    -------
+    pandas.Series
+        Index of `right` per index of `left`, geometries without any
+        intersection are dropped
+
+    """
+    left_pos, right_pos = right.sindex.query_bulk(
+        left.geometry, predicate="intersects"
+    )
+    left_pos, first = np.unique(left_pos, return_index=True)
+
+    return pd.Series(right.index[right_pos[first]], index=left.index[left_pos])
+
+
 def federal_states_per_weather_cell():
     """Assings a federal state to each weather cell in Germany.
 
     Sets the federal state to the weather celss using the centroid.
     Weather cells at the borders whoes centroid is not inside Germany
-    are assinged to the closest federal state.
+    are assinged to the closest federal state within 30 km. The spatial
+    join is done in the database using the index on the federal states.
 
     Returns
     -------
@@ -113,49 +143,27 @@ def federal_states_per_weather_cell():
 
     cfg = egon.data.config.datasets()["renewable_feedin"]["sources"]
 
-    # Select weather cells and ferear states from database
-    weather_cells = weather_cells_in_germany(geom_column="geom_point")
-
-    federal_states = db.select_geodataframe(
-        f"""SELECT gen, geometry
-        FROM {cfg['vg250_lan_union']['schema']}.
-        {cfg['vg250_lan_union']['table']}""",
-        geom_col="geometry",
-        index_col="gen",
+    return db.select_geodataframe(
+        f"""SELECT w.w_id, w.geom_point, s.gen AS federal_state
+        FROM {cfg['weather_cells']['schema']}.
+        {cfg['weather_cells']['table']} w
+        CROSS JOIN LATERAL (
+            SELECT gen
+            FROM {cfg['vg250_lan_union']['schema']}.
+            {cfg['vg250_lan_union']['table']}
+            WHERE ST_DWithin(
+                geometry, ST_Transform(w.geom_point, 3035), 30000
+            )
+            ORDER BY geometry <-> ST_Transform(w.geom_point, 3035)
+            LIMIT 1
+        ) s
+        WHERE ST_Intersects('SRID=4326;
+        POLYGON((5 56, 15.5 56, 15.5 47, 5 47, 5 56))', w.geom)""",
+        geom_col="geom_point",
+        index_col="w_id",
+        epsg=4326,
     )
 
-    # Map federal state and onshore wind turbine to weather cells
-    weather_cells["federal_state"] = gpd.sjoin(
-        weather_cells, federal_states
-    ).index_right
-
-    # Assign a federal state to each cell inside Germany
-    buffer = 1000
-
-    while (buffer < 30000) & (
-        len(weather_cells[weather_cells["federal_state"].isnull()]) > 0
-    ):
-
-        cells = weather_cells[weather_cells["federal_state"].isnull()]
-
-        cells.loc[:, "geom_point"] = cells.geom_point.buffer(buffer)
-
-        weather_cells.loc[cells.index, "federal_state"] = gpd.sjoin(
-            cells, federal_states
-        ).index_right
-
-        buffer += 200
-
-        weather_cells = (
-            weather_cells.reset_index()
-            .drop_duplicates(subset="w_id", keep="first")
-            .set_index("w_id")
-        )
-
-    weather_cells = weather_cells.dropna(axis=0, subset=["federal_state"])
-
-    return weather_cells.to_crs(4326)
-
 
 def turbine_per_weather_cell():
     """Assign wind onshore turbine types to weather cells
@@ -198,22 +206,39 @@ def turbine_per_weather_cell():
     return weather_cells
 
 
-def feedin_per_turbine():
-    """Calculate feedin timeseries per turbine type and weather cell
+def feedin_per_turbine(weather_cells):
+    """Calculate feedin timeseries per weather cell for its turbine type
+
+    The feed-in of each turbine type is only calculated for the grid cells
+    of the cutout which contain a weather cell using this turbine.
+
+    Parameters
+    ----------
+    weather_cells : GeoPandas.GeoDataFrame
+        Weather cells in Germany including turbine type
 
     Returns
     -------
-    gdf : GeoPandas.GeoDataFrame
-        Feed-in timeseries per turbine type and weather cell
+    pandas.DataFrame
+        Feed-in timeseries with one row per weather cell
 
     """
 
     # Select weather data for Germany
     cutout = import_cutout(boundary="Germany")
 
-    gdf = gpd.GeoDataFrame(geometry=cutout.grid_cells(), crs=4326)
+    grid_cells = gpd.GeoDataFrame(geometry=cutout.grid_cells(), crs=4326)
+
+    # Assign grid cells of the cutout to weather cells
+    cells = intersecting_index(weather_cells, grid_cells)
+    turbine_per_cell = weather_cells.wind_turbine[cells.index].values
 
-    # Calculate feedin-timeseries for E-141
+    # Per unit feed-in is stored in single precision
+    feedin = np.empty(
+        (len(cells), len(cutout.coords["time"])), dtype=np.float32
+    )
+
+    # Power curve of E-141
     # source:
     # https://openenergy-platform.org/dataedit/view/supply/wind_turbine_library
     turbine_e141 = {
@@ -251,13 +276,7 @@ def feedin_per_turbine():
             ]
         ),
     }
-    ts_e141 = cutout.wind(
-        turbine_e141, per_unit=True, shapes=cutout.grid_cells()
-    )
-
-    gdf["E-141"] = ts_e141.to_pandas().transpose().values.tolist()
-
-    # Calculate feedin-timeseries for E-126
+    # Power curve of E-126
     # source:
     # https://openenergy-platform.org/dataedit/view/supply/wind_turbine_library
     turbine_e126 = {
@@ -295,13 +314,27 @@ def feedin_per_turbine():
             ]
         ),
     }
-    ts_e126 = cutout.wind(
-        turbine_e126, per_unit=True, shapes=cutout.grid_cells()
-    )
+    turbines = {"E-141": turbine_e141, "E-126": turbine_e126}
 
-    gdf["E-126"] = ts_e126.to_pandas().transpose().values.tolist()
+    # Calculate feedin-timeseries per turbine for the required grid cells
+    for name, turbine in turbines.items():
+        selected = turbine_per_cell == name
+        if not selected.any():
+            continue
 
-    return gdf
+        grid_pos, cell_pos = np.unique(
+            cells.values[selected], return_inverse=True
+        )
+
+        ts = cutout.wind(
+            turbine,
+            per_unit=True,
+            shapes=grid_cells.geometry.iloc[grid_pos],
+        )
+
+        feedin[selected] = ts.transpose().values[cell_pos]
+
+    return pd.DataFrame(feedin, index=cells.index)
 
 
 def wind():
@@ -319,29 +352,19 @@ def wind():
     weather_cells = turbine_per_weather_cell()
     weather_cells = weather_cells[weather_cells.wind_turbine.notnull()]
 
-    # Calculate feedin timeseries per turbine and weather cell
-    timeseries_per_turbine = feedin_per_turbine()
-
-    # Join weather cells and feedin-timeseries
-    timeseries = gpd.sjoin(weather_cells, timeseries_per_turbine)[
-        ["E-141", "E-126"]
-    ]
+    # Calculate feedin timeseries per weather cell
+    feedin = feedin_per_turbine(weather_cells)
 
     weather_year = get_sector_parameters("global", "eGon2035")["weather_year"]
 
     df = pd.DataFrame(
-        index=weather_cells.index,
+        index=feedin.index,
         columns=["weather_year", "carrier", "feedin"],
         data={"weather_year": weather_year, "carrier": "wind_onshore"},
     )
 
-    # Insert feedin for selected turbine per weather cell
-    for turbine in ["E-126", "E-141"]:
-        idx = weather_cells.index[
-            (weather_cells.wind_turbine == turbine)
-            & (weather_cells.index.isin(timeseries.index))
-        ]
-        df.loc[idx, "feedin"] = timeseries.loc[idx, turbine].values
+    # Insert feedin for selected turbine per weather cell as array literal
+    df["feedin"] = ["{" + ",".join(map(str, ts)) + "}" for ts in feedin.values]
 
     db.execute_sql(
         f"""
@@ -356,6 +379,7 @@ def wind():
         schema=cfg["feedin_table"]["schema"],
         con=db.engine(),
         if_exists="append",
+        method=db.copy_insert,
     )
 
 
@@ -497,7 +521,8 @@ def heat_pump_cop():
         data={"weather_year": weather_year, "carrier": carrier},
     )
 
-    df.feedin = cop.values.tolist()
+    # Insert cop as array literal
+    df.feedin = ["{" + ",".join(map(str, ts)) + "}" for ts in cop.values]
 
     # Delete existing rows for carrier
     db.execute_sql(
@@ -513,6 +538,7 @@ def heat_pump_cop():
         schema=cfg["targets"]["feedin_table"]["schema"],
         con=db.engine(),
         if_exists="append",
+        method=db.copy_insert,
     )
 
 
@@ -550,8 +576,8 @@ def insert_feedin(data, carrier, weather_year):
     if carrier == "solar_thermal":
         data *= 1e-3
 
-    # Insert feedin into DataFrame
-    df.feedin = data.values.tolist()
+    # Insert feedin into DataFrame as array literal
+    df.feedin = ["{" + ",".join(map(str, ts)) + "}" for ts in data.values]
 
     # Delete existing rows for carrier
     db.execute_sql(
@@ -567,6 +593,7 @@ def insert_feedin(data, carrier, weather_year):
         schema=cfg["targets"]["feedin_table"]["schema"],
         con=db.engine(),
         if_exists="append",
+        method=db.copy_insert,
     )
 
 
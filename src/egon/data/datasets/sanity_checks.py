@@ -114,85 +114,81 @@ def etrago_eGon2035_electricity():
         "biomass",
     ]
 
-    for carrier in carriers_electricity:
-
-        if carrier == "biomass":
-            sum_output = db.select_dataframe(
-                """SELECT scn_name, SUM(p_nom::numeric) as output_capacity_mw
-                    FROM grid.egon_etrago_generator
-                    WHERE bus IN (
-                        SELECT bus_id FROM grid.egon_etrago_bus
-                        WHERE scn_name = 'eGon2035'
-                        AND country = 'DE')
-                    AND carrier IN ('biomass', 'industrial_biomass_CHP',
-                    'central_biomass_CHP')
-                    GROUP BY (scn_name);
-                """,
-                warning=False,
-            )
-
-        else:
-            sum_output = db.select_dataframe(
-                f"""SELECT scn_name,
-                 SUM(p_nom::numeric) as output_capacity_mw
-                         FROM grid.egon_etrago_generator
-                         WHERE scn_name = '{scn}'
-                         AND carrier IN ('{carrier}')
-                         AND bus IN
-                             (SELECT bus_id
-                               FROM grid.egon_etrago_bus
-                               WHERE scn_name = 'eGon2035'
-                               AND country = 'DE')
-                         GROUP BY (scn_name);
-                    """,
-                warning=False,
-            )
-
-        sum_input = db.select_dataframe(
-            f"""SELECT carrier, SUM(capacity::numeric) as input_capacity_mw
-                     FROM supply.egon_scenario_capacities
-                     WHERE carrier= '{carrier}'
-                     AND scenario_name ='{scn}'
-                     GROUP BY (carrier);
-                """,
+    # Both sides are fetched with one grouped query each, the biomass CHP
+    # carriers of the generator table count towards biomass
+    sum_output = (
+        db.select_dataframe(
+            f"""SELECT carrier, SUM(p_nom::numeric) as output_capacity_mw
+                FROM grid.egon_etrago_generator
+                WHERE scn_name = '{scn}'
+                AND bus IN
+                    (SELECT bus_id
+                      FROM grid.egon_etrago_bus
+                      WHERE scn_name = '{scn}'
+                      AND country = 'DE')
+                GROUP BY (carrier);
+            """,
             warning=False,
         )
+        .replace(
+            {
+                "carrier": {
+                    "industrial_biomass_CHP": "biomass",
+                    "central_biomass_CHP": "biomass",
+                }
+            }
+        )
+        .groupby("carrier")
+        .output_capacity_mw.sum()
+    )
+
+    sum_input = db.select_dataframe(
+        f"""SELECT carrier, SUM(capacity::numeric) as input_capacity_mw
+            FROM supply.egon_scenario_capacities
+            WHERE scenario_name = '{scn}'
+            GROUP BY (carrier);
+        """,
+        index_col="carrier",
+        warning=False,
+    ).input_capacity_mw
+
+    capacities = pd.DataFrame(
+        {
+            "output_capacity_mw": sum_output.reindex(
+                carriers_electricity, fill_value=0
+            ),
+            "input_capacity_mw": sum_input.reindex(
+                carriers_electricity, fill_value=0
+            ),
+        }
+    ).astype(float)
+    capacities["error"] = (
+        (capacities.output_capacity_mw - capacities.input_capacity_mw)
+        / capacities.input_capacity_mw
+    ) * 100
+
+    for carrier, row in capacities.iterrows():
 
-        if (
-            sum_output.output_capacity_mw.sum() == 0
-            and sum_input.input_capacity_mw.sum() == 0
-        ):
+        if row.output_capacity_mw == 0 and row.input_capacity_mw == 0:
             logger.info(
                 f"No capacity for carrier '{carrier}' needed to be"
                 f" distributed. Everything is fine"
             )
 
-        elif (
-            sum_input.input_capacity_mw.sum() > 0
-            and sum_output.output_capacity_mw.sum() == 0
-        ):
+        elif row.input_capacity_mw > 0 and row.output_capacity_mw == 0:
             logger.info(
                 f"Error: Capacity for carrier '{carrier}' was not distributed "
                 f"at all!"
             )
 
-        elif (
-            sum_output.output_capacity_mw.sum() > 0
-            and sum_input.input_capacity_mw.sum() == 0
-        ):
+        elif row.output_capacity_mw > 0 and row.input_capacity_mw == 0:
             logger.info(
                 f"Error: Eventhough no input capacity was provided for carrier"
                 f"'{carrier}' a capacity got distributed!"
             )
 
         else:
-            sum_input["error"] = (
-                (sum_output.output_capacity_mw - sum_input.input_capacity_mw)
-                / sum_input.input_capacity_mw
-            ) * 100
-            g = sum_input["error"].values[0]
-
-            logger.info(f"{carrier}: " + str(round(g, 2)) + " %")
+            logger.info(f"{carrier}: " + str(round(row.error, 2)) + " %")
 
     # Section to check storage units
 
@@ -204,68 +200,59 @@ def etrago_eGon2035_electricity():
 
     carriers_electricity = ["pumped_hydro"]
 
-    for carrier in carriers_electricity:
-
-        sum_output = db.select_dataframe(
-            f"""SELECT scn_name, SUM(p_nom::numeric) as output_capacity_mw
-                         FROM grid.egon_etrago_storage
-                         WHERE scn_name = '{scn}'
-                         AND carrier IN ('{carrier}')
-                         AND bus IN
-                             (SELECT bus_id
-                               FROM grid.egon_etrago_bus
-                               WHERE scn_name = 'eGon2035'
-                               AND country = 'DE')
-                         GROUP BY (scn_name);
-                    """,
-            warning=False,
-        )
+    sum_output = db.select_dataframe(
+        f"""SELECT carrier, SUM(p_nom::numeric) as output_capacity_mw
+            FROM grid.egon_etrago_storage
+            WHERE scn_name = '{scn}'
+            AND bus IN
+                (SELECT bus_id
+                  FROM grid.egon_etrago_bus
+                  WHERE scn_name = '{scn}'
+                  AND country = 'DE')
+            GROUP BY (carrier);
+        """,
+        index_col="carrier",
+        warning=False,
+    ).output_capacity_mw
 
-        sum_input = db.select_dataframe(
-            f"""SELECT carrier, SUM(capacity::numeric) as input_capacity_mw
-                     FROM supply.egon_scenario_capacities
-                     WHERE carrier= '{carrier}'
-                     AND scenario_name ='{scn}'
-                     GROUP BY (carrier);
-                """,
-            warning=False,
-        )
+    # Input capacities were already fetched for all carriers above
+    capacities = pd.DataFrame(
+        {
+            "output_capacity_mw": sum_output.reindex(
+                carriers_electricity, fill_value=0
+            ),
+            "input_capacity_mw": sum_input.reindex(
+                carriers_electricity, fill_value=0
+            ),
+        }
+    ).astype(float)
+    capacities["error"] = (
+        (capacities.output_capacity_mw - capacities.input_capacity_mw)
+        / capacities.input_capacity_mw
+    ) * 100
+
+    for carrier, row in capacities.iterrows():
 
-        if (
-            sum_output.output_capacity_mw.sum() == 0
-            and sum_input.input_capacity_mw.sum() == 0
-        ):
+        if row.output_capacity_mw == 0 and row.input_capacity_mw == 0:
             print(
                 f"No capacity for carrier '{carrier}' needed to be "
                 f"distributed. Everything is fine"
             )
 
-        elif (
-            sum_input.input_capacity_mw.sum() > 0
-            and sum_output.output_capacity_mw.sum() == 0
-        ):
+        elif row.input_capacity_mw > 0 and row.output_capacity_mw == 0:
             print(
                 f"Error: Capacity for carrier '{carrier}' was not distributed"
                 f" at all!"
             )
 
-        elif (
-            sum_output.output_capacity_mw.sum() > 0
-            and sum_input.input_capacity_mw.sum() == 0
-        ):
+        elif row.output_capacity_mw > 0 and row.input_capacity_mw == 0:
             print(
                 f"Error: Eventhough no input capacity was provided for carrier"
                 f" '{carrier}' a capacity got distributed!"
             )
 
         else:
-            sum_input["error"] = (
-                (sum_output.output_capacity_mw - sum_input.input_capacity_mw)
-                / sum_input.input_capacity_mw
-            ) * 100
-            g = sum_input["error"].values[0]
-
-            print(f"{carrier}: " + str(round(g, 2)) + " %")
+            print(f"{carrier}: " + str(round(row.error, 2)) + " %")
 
     # Section to check loads
 
@@ -4,9 +4,8 @@ Netzentwicklungsplan 2035, Version 2031, Szenario C
 
 from pathlib import Path
 
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import Column, Float, Integer, String, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 import numpy as np
 import pandas as pd
 import yaml
@@ -61,7 +60,7 @@ class ScenarioCapacities(Dataset):
     def __init__(self, dependencies):
         super().__init__(
             name="ScenarioCapacities",
-            version="0.0.13",
+            version="0.0.14",
             dependencies=dependencies,
             tasks=(create_table, insert_data_nep, eGon100_capacities),
         )
@@ -76,12 +75,13 @@ def create_table():
 
     """
 
-    engine = db.engine()
-    db.execute_sql("CREATE SCHEMA IF NOT EXISTS supply;")
-    EgonScenarioCapacities.__table__.drop(bind=engine, checkfirst=True)
-    NEP2021ConvPowerPlants.__table__.drop(bind=engine, checkfirst=True)
-    EgonScenarioCapacities.__table__.create(bind=engine, checkfirst=True)
-    NEP2021ConvPowerPlants.__table__.create(bind=engine, checkfirst=True)
+    # Set up schema and tables within one transaction
+    with db.engine().begin() as con:
+        con.execute(text("CREATE SCHEMA IF NOT EXISTS supply;"))
+        EgonScenarioCapacities.__table__.drop(bind=con, checkfirst=True)
+        NEP2021ConvPowerPlants.__table__.drop(bind=con, checkfirst=True)
+        EgonScenarioCapacities.__table__.create(bind=con, checkfirst=True)
+        NEP2021ConvPowerPlants.__table__.create(bind=con, checkfirst=True)
 
 
 def nuts_mapping():
@@ -118,8 +118,9 @@ def insert_capacities_per_federal_state_nep():
 
     """
 
-    sources = egon.data.config.datasets()["scenario_input"]["sources"]
-    targets = egon.data.config.datasets()["scenario_input"]["targets"]
+    cfg = egon.data.config.datasets()["scenario_input"]
+    sources = cfg["sources"]
+    targets = cfg["targets"]
 
     # Connect to local database
     engine = db.engine()
@@ -135,6 +136,16 @@ def insert_capacities_per_federal_state_nep():
         """
     )
 
+    # nuts1 to federal state in Germany
+    map_nuts = pd.read_sql(
+        f"""
+        SELECT DISTINCT ON (nuts) gen, nuts
+        FROM {sources['boundaries']['schema']}.{sources['boundaries']['table']}
+        """,
+        engine,
+        index_col="gen",
+    )["nuts"]
+
     # read-in installed capacities per federal state of germany
     target_file = (
         Path(".")
@@ -143,22 +154,34 @@ def insert_capacities_per_federal_state_nep():
         / sources["eGon2035"]["capacities"]
     )
 
+    # Open the workbook once for all sheets, openpyxl reads it in
+    # read-only mode
+    capacities_file = pd.ExcelFile(target_file, engine="openpyxl")
+
+    # All capacities are floats, which spares the dtype inference
+    dtype_capacities = {column: float for column in [*map_nuts.index, "Summe"]}
+
     df = pd.read_excel(
-        target_file,
+        capacities_file,
         sheet_name="1.Entwurf_NEP2035_V2021",
         index_col="Unnamed: 0",
+        usecols=["Unnamed: 0", *map_nuts.index, "Summe"],
+        dtype=dtype_capacities,
     )
 
     df_draft = pd.read_excel(
-        target_file,
+        capacities_file,
         sheet_name="Entwurf_des_Szenariorahmens",
         index_col="Unnamed: 0",
+        usecols=["Unnamed: 0", *map_nuts.index, "Summe"],
+        dtype=dtype_capacities,
     )
 
     # Import data on wind offshore capacities
     df_windoff = pd.read_excel(
-        target_file,
+        capacities_file,
         sheet_name="WInd_Offshore_NEP",
+        usecols=["Bundesland", "Netzverknuepfungspunkt", "C 2035"],
     ).dropna(subset=["Bundesland", "Netzverknuepfungspunkt"])
 
     # Remove trailing whitespace from column Bundesland
@@ -202,66 +225,76 @@ def insert_capacities_per_federal_state_nep():
     # 'Elektromobilitaet gesamt': 'transport',
     # 'Elektromobilitaet privat': 'transport'}
 
-    # nuts1 to federal state in Germany
-    map_nuts = pd.read_sql(
-        f"""
-        SELECT DISTINCT ON (nuts) gen, nuts
-        FROM {sources['boundaries']['schema']}.{sources['boundaries']['table']}
-        """,
-        engine,
-        index_col="gen",
-    )
-
-    insert_data = pd.DataFrame()
-
     scaled_carriers = [
         "Haushaltswaermepumpen",
         "PV (Aufdach)",
         "PV (Freiflaeche)",
     ]
 
-    for bl in map_nuts.index:
-
-        data = pd.DataFrame(df[bl])
-
-        # if distribution to federal states is not provided,
-        # use data from draft of scenario report
-        for c in scaled_carriers:
-            data.loc[c, bl] = (
-                df_draft.loc[c, bl]
-                / df_draft.loc[c, "Summe"]
-                * df.loc[c, "Summe"]
-            )
-
-        # split hydro into run of river and reservoir
-        # according to draft of scenario report
-        if data.loc["Lauf- und Speicherwasser", bl] > 0:
-            for c in ["Speicherwasser", "Laufwasser"]:
-                data.loc[c, bl] = (
-                    data.loc["Lauf- und Speicherwasser", bl]
-                    * df_draft.loc[c, bl]
-                    / df_draft.loc[["Speicherwasser", "Laufwasser"], bl].sum()
-                )
-
-        data["carrier"] = data.index.map(rename_carrier)
-        data = data.groupby(data.carrier)[bl].sum().reset_index()
-        data["component"] = "generator"
-        data["nuts"] = map_nuts.nuts[bl]
-        data["scenario_name"] = "eGon2035"
+    # if distribution to federal states is not provided,
+    # use data from draft of scenario report
+    df.loc[scaled_carriers, map_nuts.index] = (
+        df_draft.loc[scaled_carriers, map_nuts.index]
+        .div(df_draft.loc[scaled_carriers, "Summe"], axis=0)
+        .mul(df.loc[scaled_carriers, "Summe"], axis=0)
+    )
 
-        # According to NEP, each heatpump has 5kW_el installed capacity
-        # source: Entwurf des Szenariorahmens NEP 2035, version 2021, page 47
-        data.loc[data.carrier == "residential_rural_heat_pump", bl] *= 5e-6
-        data.loc[
-            data.carrier == "residential_rural_heat_pump", "component"
-        ] = "link"
+    # split hydro into run of river and reservoir
+    # according to draft of scenario report
+    hydro = df.loc["Lauf- und Speicherwasser", map_nuts.index]
+    hydro = hydro[hydro > 0]
+    hydro_draft = df_draft.loc[["Speicherwasser", "Laufwasser"], hydro.index]
+    hydro_split = hydro_draft.mul(hydro).div(hydro_draft.sum())
+
+    # Capacities per NEP carrier and federal state, for states with hydro
+    # capacity the split hydro replaces the combined hydro
+    capacities = pd.concat(
+        [
+            df[
+                map_nuts.index.difference(hydro_split.columns, sort=False)
+            ].stack(dropna=False),
+            pd.concat(
+                [
+                    df.loc[
+                        ~df.index.isin(hydro_split.index), hydro_split.columns
+                    ],
+                    hydro_split,
+                ]
+            ).stack(dropna=False),
+        ]
+    )
 
-        data = data.rename(columns={bl: "capacity"})
+    # Sum up capacities per federal state and eGon carrier, the categories
+    # keep the order of the federal states
+    insert_data = (
+        capacities.groupby(
+            [
+                pd.Categorical(
+                    capacities.index.get_level_values(1).map(map_nuts),
+                    categories=map_nuts.values,
+                ),
+                capacities.index.get_level_values(0).map(rename_carrier),
+            ],
+            observed=True,
+        )
+        .sum()
+        .sort_index()
+        .rename_axis(["nuts", "carrier"])
+        .rename("capacity")
+        .reset_index()
+    )
+    insert_data["nuts"] = insert_data["nuts"].astype(object)
+    insert_data["component"] = "generator"
+    insert_data["scenario_name"] = "eGon2035"
 
-        # convert GW to MW
-        data.capacity *= 1e3
+    # According to NEP, each heatpump has 5kW_el installed capacity
+    # source: Entwurf des Szenariorahmens NEP 2035, version 2021, page 47
+    heat_pumps = insert_data.carrier == "residential_rural_heat_pump"
+    insert_data.loc[heat_pumps, "capacity"] *= 5e-6
+    insert_data.loc[heat_pumps, "component"] = "link"
 
-        insert_data = insert_data.append(data)
+    # convert GW to MW
+    insert_data.capacity *= 1e3
 
     # Get aggregated capacities from nep's power plant list for certain carrier
 
@@ -294,10 +327,11 @@ def insert_capacities_per_federal_state_nep():
         schema=targets["scenario_capacities"]["schema"],
         if_exists="append",
         index=insert_data.index,
+        method=db.copy_insert,
     )
 
     # Add district heating data accordning to energy and full load hours
-    district_heating_input()
+    district_heating_input(capacities_file)
 
 
 def population_share():
@@ -410,8 +444,9 @@ def insert_nep_list_powerplants(export=True):
         List of conventional power plants from nep if export=False
     """
 
-    sources = egon.data.config.datasets()["scenario_input"]["sources"]
-    targets = egon.data.config.datasets()["scenario_input"]["targets"]
+    cfg = egon.data.config.datasets()["scenario_input"]
+    sources = cfg["sources"]
+    targets = cfg["targets"]
 
     # Connect to local database
     engine = db.engine()
@@ -424,32 +459,33 @@ def insert_nep_list_powerplants(export=True):
         / sources["eGon2035"]["list_conv_pp"]
     )
 
-    kw_liste_nep = pd.read_csv(target_file, delimiter=";", decimal=",")
-
-    # Adjust column names
-    kw_liste_nep = kw_liste_nep.rename(
-        columns={
-            "BNetzA-ID": "bnetza_id",
-            "Kraftwerksname": "name",
-            "Blockname": "name_unit",
-            "Energieträger": "carrier_nep",
-            "KWK\nJa/Nein": "chp",
-            "PLZ": "postcode",
-            "Ort": "city",
-            "Bundesland/\nLand": "federal_state",
-            "Inbetrieb-\nnahmejahr": "commissioned",
-            "Status": "status",
-            "el. Leistung\n06.02.2020": "capacity",
-            "A 2035:\nKWK-Ersatz": "a2035_chp",
-            "A 2035:\nLeistung": "a2035_capacity",
-            "B 2035\nKWK-Ersatz": "b2035_chp",
-            "B 2035:\nLeistung": "b2035_capacity",
-            "C 2035:\nKWK-Ersatz": "c2035_chp",
-            "C 2035:\nLeistung": "c2035_capacity",
-            "B 2040:\nKWK-Ersatz": "b2040_chp",
-            "B 2040:\nLeistung": "b2040_capacity",
-        }
-    )
+    # Column names of the csv-file and their names in the database
+    columns = {
+        "BNetzA-ID": "bnetza_id",
+        "Kraftwerksname": "name",
+        "Blockname": "name_unit",
+        "Energieträger": "carrier_nep",
+        "KWK\nJa/Nein": "chp",
+        "PLZ": "postcode",
+        "Ort": "city",
+        "Bundesland/\nLand": "federal_state",
+        "Inbetrieb-\nnahmejahr": "commissioned",
+        "Status": "status",
+        "el. Leistung\n06.02.2020": "capacity",
+        "A 2035:\nKWK-Ersatz": "a2035_chp",
+        "A 2035:\nLeistung": "a2035_capacity",
+        "B 2035\nKWK-Ersatz": "b2035_chp",
+        "B 2035:\nLeistung": "b2035_capacity",
+        "C 2035:\nKWK-Ersatz": "c2035_chp",
+        "C 2035:\nLeistung": "c2035_capacity",
+        "B 2040:\nKWK-Ersatz": "b2040_chp",
+        "B 2040:\nLeistung": "b2040_capacity",
+    }
+
+    # Read-in only the used columns and adjust their names
+    kw_liste_nep = pd.read_csv(
+        target_file, delimiter=";", decimal=",", usecols=list(columns)
+    ).rename(columns=columns)
 
     # Cut data to federal state if in testmode
     boundary = settings()["egon-data"]["--dataset-boundary"]
@@ -491,37 +527,65 @@ def insert_nep_list_powerplants(export=True):
     kw_liste_nep["carrier"] = map_carrier()[kw_liste_nep.carrier_nep].values
 
     if export is True:
+        # Empty the table created in create_table() and keep its data types
+        db.execute_sql(
+            f"""
+            TRUNCATE {targets['nep_conventional_powerplants']['schema']}.
+            {targets['nep_conventional_powerplants']['table']}
+            """
+        )
+
         # Insert data to db
-        kw_liste_nep.to_sql(
+        kw_liste_nep[
+            [
+                column.name
+                for column in NEP2021ConvPowerPlants.__table__.columns
+                if column.name != "index"
+            ]
+        ].to_sql(
             targets["nep_conventional_powerplants"]["table"],
             engine,
             schema=targets["nep_conventional_powerplants"]["schema"],
-            if_exists="replace",
+            if_exists="append",
+            method=db.copy_insert,
         )
     else:
         return kw_liste_nep
 
 
-def district_heating_input():
+def district_heating_input(capacities_file=None):
     """Imports data for district heating networks in Germany
 
+    Parameters
+    ----------
+    capacities_file : pandas.ExcelFile, optional
+        Already opened workbook with the capacities of NEP 2035. If None,
+        the workbook is read from the data bundle.
+
     Returns
     -------
     None.
 
     """
 
-    sources = egon.data.config.datasets()["scenario_input"]["sources"]
+    cfg = egon.data.config.datasets()["scenario_input"]
+    sources = cfg["sources"]
+    targets = cfg["targets"]
+
+    if capacities_file is None:
+        capacities_file = (
+            Path(".")
+            / "data_bundle_egon_data"
+            / "nep2035_version2021"
+            / sources["eGon2035"]["capacities"]
+        )
 
     # import data to dataframe
-    file = (
-        Path(".")
-        / "data_bundle_egon_data"
-        / "nep2035_version2021"
-        / sources["eGon2035"]["capacities"]
-    )
     df = pd.read_excel(
-        file, sheet_name="Kurzstudie_KWK", dtype={"Wert": float}
+        capacities_file,
+        sheet_name="Kurzstudie_KWK",
+        usecols=["Energietraeger", "Name", "Wert"],
+        dtype={"Wert": float},
     )
     df.set_index(["Energietraeger", "Name"], inplace=True)
 
@@ -531,46 +595,45 @@ def district_heating_input():
             pd.IndexSlice[:, "Fernwaermeerzeugung"], "Wert"
         ] *= population_share()
 
-    # Connect to database
-    engine = db.engine()
-    session = sessionmaker(bind=engine)()
-
-    # insert heatpumps and resistive heater as link
-    for c in ["Grosswaermepumpe", "Elektrodenheizkessel"]:
-        entry = EgonScenarioCapacities(
-            component="link",
-            scenario_name="eGon2035",
-            nuts="DE",
-            carrier="urban_central_"
-            + ("heat_pump" if c == "Grosswaermepumpe" else "resistive_heater"),
-            capacity=df.loc[(c, "Fernwaermeerzeugung"), "Wert"]
-            * 1e6
-            / df.loc[(c, "Volllaststunden"), "Wert"]
-            / df.loc[(c, "Wirkungsgrad"), "Wert"],
-        )
-
-        session.add(entry)
-
-    # insert solar- and geothermal as generator
-    for c in ["Geothermie", "Solarthermie"]:
-        entry = EgonScenarioCapacities(
-            component="generator",
-            scenario_name="eGon2035",
-            nuts="DE",
-            carrier="urban_central_"
-            + (
-                "solar_thermal_collector"
-                if c == "Solarthermie"
-                else "geo_thermal"
-            ),
-            capacity=df.loc[(c, "Fernwaermeerzeugung"), "Wert"]
-            * 1e6
-            / df.loc[(c, "Volllaststunden"), "Wert"],
-        )
-
-        session.add(entry)
+    # One row per technology with its parameters as columns
+    values = df["Wert"].unstack("Name")
+
+    # heatpumps and resistive heater are links, solar- and geothermal are
+    # generators
+    capacities = pd.DataFrame(
+        index=[
+            "Grosswaermepumpe",
+            "Elektrodenheizkessel",
+            "Geothermie",
+            "Solarthermie",
+        ],
+        data={
+            "component": ["link", "link", "generator", "generator"],
+            "carrier": [
+                "urban_central_heat_pump",
+                "urban_central_resistive_heater",
+                "urban_central_geo_thermal",
+                "urban_central_solar_thermal_collector",
+            ],
+        },
+    )
+    capacities["capacity"] = (
+        values["Fernwaermeerzeugung"] * 1e6 / values["Volllaststunden"]
+    )
+    links = capacities.component == "link"
+    capacities.loc[links, "capacity"] /= values["Wirkungsgrad"]
+    capacities["scenario_name"] = "eGon2035"
+    capacities["nuts"] = "DE"
 
-    session.commit()
+    # Insert data to db
+    capacities.to_sql(
+        targets["scenario_capacities"]["table"],
+        db.engine(),
+        schema=targets["scenario_capacities"]["schema"],
+        if_exists="append",
+        index=False,
+        method=db.copy_insert,
+    )
 
 
 def insert_data_nep():
@@ -596,8 +659,9 @@ def eGon100_capacities():
 
     """
 
-    sources = egon.data.config.datasets()["scenario_input"]["sources"]
-    targets = egon.data.config.datasets()["scenario_input"]["targets"]
+    cfg = egon.data.config.datasets()["scenario_input"]
+    sources = cfg["sources"]
+    targets = cfg["targets"]
 
     # read-in installed capacities
     execute_pypsa_eur_sec = False
@@ -13,7 +13,10 @@ import pandas as pd
 from egon.data import config, db
 from egon.data.datasets import Dataset
 from egon.data.datasets.mastr import WORKING_DIR_MASTR_OLD
-from egon.data.datasets.power_plants import assign_voltage_level
+from egon.data.datasets.power_plants import (
+    assign_voltage_level,
+    write_table_with_sequence_ids,
+)
 from egon.data.datasets.storages.home_batteries import (
     allocate_home_batteries_to_buildings,
 )
@@ -77,6 +80,47 @@ def create_tables():
     EgonStorages.__table__.create(bind=engine, checkfirst=True)
 
 
+def write_storages_table(power_plants, con):
+    """Append matched storage units to the target table in one bulk insert
+
+    Parameters
+    ----------
+    power_plants : geopandas.GeoDataFrame
+        Storage units with source, MaStRNummer, carrier, el_capacity,
+        voltage_level, bus_id, scenario and point geometries in EPSG:4326
+    con : sqlalchemy.engine.Connection
+        Database connection used for the insert
+
+    Returns
+    -------
+    None.
+
+    """
+    write_table_with_sequence_ids(
+        gpd.GeoDataFrame(
+            {
+                "sources": [
+                    {"el_capacity": source} for source in power_plants.source
+                ],
+                "source_id": [
+                    {"MastrNummer": nr} for nr in power_plants.MaStRNummer
+                ],
+                "carrier": power_plants.carrier.values,
+                "el_capacity": power_plants.el_capacity.values,
+                "voltage_level": power_plants.voltage_level.values,
+                "bus_id": power_plants.bus_id.values,
+                "scenario": power_plants.scenario.values,
+            },
+            geometry=power_plants.geometry.values,
+            crs=4326,
+        ),
+        EgonStorages.__table__.schema,
+        EgonStorages.__table__.name,
+        "storage_seq",
+        con,
+    )
+
+
 def allocate_pumped_hydro_eGon2035(export=True):
     """Allocates pumped_hydro plants for eGon2035 scenario and either exports
     results to data base or returns as a dataframe
@@ -240,20 +284,8 @@ def allocate_pumped_hydro_eGon2035(export=True):
 
     if export:
         # Insert into target table
-        session = sessionmaker(bind=db.engine())()
-        for i, row in power_plants.iterrows():
-            entry = EgonStorages(
-                sources={"el_capacity": row.source},
-                source_id={"MastrNummer": row.MaStRNummer},
-                carrier=row.carrier,
-                el_capacity=row.el_capacity,
-                voltage_level=row.voltage_level,
-                bus_id=row.bus_id,
-                scenario=row.scenario,
-                geom=f"SRID=4326;POINT({row.geometry.x} {row.geometry.y})",
-            )
-            session.add(entry)
-        session.commit()
+        with db.engine().begin() as con:
+            write_storages_table(power_plants, con)
 
     else:
         return power_plants
@@ -310,20 +342,8 @@ def allocate_pumped_hydro_eGon100RE():
     power_plants["el_capacity"] = allocation.el_capacity * scaling_factor
 
     # Insert into target table
-    session = sessionmaker(bind=db.engine())()
-    for i, row in power_plants.iterrows():
-        entry = EgonStorages(
-            sources={"el_capacity": row.source},
-            source_id={"MastrNummer": row.MaStRNummer},
-            carrier=row.carrier,
-            el_capacity=row.el_capacity,
-            voltage_level=row.voltage_level,
-            bus_id=row.bus_id,
-            scenario=row.scenario,
-            geom=f"SRID=4326;POINT({row.geometry.x} {row.geometry.y})",
-        )
-        session.add(entry)
-    session.commit()
+    with db.engine().begin() as con:
+        write_storages_table(power_plants, con)
 
 
 def home_batteries_per_scenario(scenario):
@@ -189,6 +189,10 @@ def match_storage_units(
 
     carrier = "pumped_hydro"
 
+    # Matched storage units and their index in MaStR, added to matched at once
+    matches = []
+    matches_index = []
+
     for index, row in nep[
         (nep["carrier"] == carrier) & (nep["postcode"] != "None")
     ].iterrows():
@@ -229,21 +233,20 @@ def match_storage_units(
         if consider_carrier:
             selected = selected[selected.carrier == carrier]
 
-        # If a plant could be matched, add this to matched
+        # If a plant could be matched, add this to the matches
         if len(selected) > 0:
-            matched = matched.append(
-                gpd.GeoDataFrame(
-                    data={
-                        "source": "MaStR scaled with NEP 2021 list",
-                        "MaStRNummer": selected.EinheitMastrNummer.head(1),
-                        "carrier": carrier,
-                        "el_capacity": row.c2035_capacity,
-                        "scenario": "eGon2035",
-                        "geometry": selected.geometry.head(1),
-                        "voltage_level": selected.voltage_level.head(1),
-                    }
-                )
+            matches.append(
+                {
+                    "source": "MaStR scaled with NEP 2021 list",
+                    "MaStRNummer": selected.EinheitMastrNummer.iat[0],
+                    "carrier": carrier,
+                    "el_capacity": row.c2035_capacity,
+                    "scenario": "eGon2035",
+                    "geometry": selected.geometry.iat[0],
+                    "voltage_level": selected.voltage_level.iat[0],
+                }
             )
+            matches_index.append(selected.index[0])
 
             # Drop matched storage units from nep
             nep = nep.drop(index)
@@ -252,6 +255,11 @@ def match_storage_units(
             if consider_capacity & consider_carrier:
                 mastr = mastr.drop(selected.index)
 
+    if matches:
+        matched = matched.append(
+            gpd.GeoDataFrame(matches, index=matches_index)
+        )
+
     return matched, mastr, nep
 
 
@@ -74,7 +74,7 @@ class SubstationExtraction(Dataset):
     def __init__(self, dependencies):
         super().__init__(
             name="substation_extraction",
-            version="0.0.2",
+            version="0.0.3",
             dependencies=dependencies,
             tasks=(
                 create_tables,
@@ -163,26 +163,10 @@ def create_sql_functions():
         CREATE OR REPLACE FUNCTION utmzone(geometry)
         RETURNS integer AS
         $BODY$
-        DECLARE
-        geomgeog geometry;
-        zone int;
-        pref int;
-
-        BEGIN
-        geomgeog:= ST_Transform($1,4326);
-
-        IF (ST_Y(geomgeog))>0 THEN
-        pref:=32600;
-        ELSE
-        pref:=32700;
-        END IF;
-
-        zone:=floor((ST_X(geomgeog)+180)/6)+1;
-
-        RETURN zone+pref;
-        END;
-        $BODY$ LANGUAGE 'plpgsql' IMMUTABLE
-        COST 100;
+        SELECT (CASE WHEN ST_Y(geomgeog) > 0 THEN 32600 ELSE 32700 END
+                + floor((ST_X(geomgeog) + 180) / 6) + 1)::integer
+        FROM (SELECT ST_Transform($1, 4326) AS geomgeog) AS t;
+        $BODY$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
         """
     )
 
@@ -195,24 +179,35 @@ def create_sql_functions():
         CREATE OR REPLACE FUNCTION relation_geometry (members text[])
         RETURNS geometry
         AS $$
-        DECLARE
-        way  geometry;
-        BEGIN
-            way = (SELECT ST_SetSRID
-                   (ST_MakePoint((max(lon) + min(lon))/200.0,(max(lat) + min(lat))/200.0),900913)
-                   FROM openstreetmap.osm_nodes
-                   WHERE id in (SELECT unnest(nodes)
-                     FROM openstreetmap.osm_ways
-                     WHERE id in (SELECT trim(leading 'w' from member)::bigint
-			                     FROM (SELECT unnest(members) as member) t
-	                               WHERE member~E'[w,1,2,3,4,5,6,7,8,9,0]')));
-        RETURN way;
-        END;
-        $$ LANGUAGE plpgsql;
+        -- node coordinates are stored as integers in 1/100 units
+        SELECT ST_SetSRID
+               (ST_MakePoint((max(n.lon) + min(n.lon))/200.0,(max(n.lat) + min(n.lat))/200.0),900913)
+        FROM openstreetmap.osm_ways w
+        CROSS JOIN LATERAL unnest(w.nodes) AS way_nodes(node_id)
+        JOIN openstreetmap.osm_nodes n ON n.id = way_nodes.node_id
+        WHERE w.id IN (SELECT substr(member, 2)::bigint
+                       FROM unnest(members) AS member
+                       WHERE member ~ '^w[0-9]+$');
+        $$ LANGUAGE sql STABLE;
+        """
+    )
+
+    # Create function: ST_Buffer_Meters(geometry, double precision, integer)
+    # Buffers in the given UTM zone and transforms back to the original SRID
+
+    db.execute_sql(
+        """
+        DROP FUNCTION IF EXISTS ST_Buffer_Meters(geometry, double precision, integer) CASCADE;
+        CREATE OR REPLACE FUNCTION ST_Buffer_Meters(geometry, double precision, integer)
+        RETURNS geometry AS
+        $BODY$
+        SELECT ST_Transform(ST_Buffer(ST_Transform($1, $3), $2), ST_SRID($1));
+        $BODY$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
         """
     )
 
     # Create function: ST_Buffer_Meters(geometry, double precision)
+    # Determines the UTM zone from the centroid of each geometry
 
     db.execute_sql(
         """
@@ -220,18 +215,8 @@ def create_sql_functions():
         CREATE OR REPLACE FUNCTION ST_Buffer_Meters(geometry, double precision)
         RETURNS geometry AS
         $BODY$
-        DECLARE
-        orig_srid int;
-        utm_srid int;
-
-        BEGIN
-        orig_srid:= ST_SRID($1);
-        utm_srid:= utmzone(ST_Centroid($1));
-
-        RETURN ST_transform(ST_Buffer(ST_transform($1, utm_srid), $2), orig_srid);
-        END;
-        $BODY$ LANGUAGE 'plpgsql' IMMUTABLE
-        COST 100;
+        SELECT ST_Buffer_Meters($1, $2, utmzone(ST_Centroid($1)));
+        $BODY$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
         """
     )
 
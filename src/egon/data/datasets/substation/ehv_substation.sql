@@ -126,13 +126,13 @@ CREATE VIEW		grid.egon_summary_de_hoes AS
 -- create view with buffer of 75m around polygons
 DROP MATERIALIZED VIEW IF EXISTS 	grid.egon_buffer_75_hoes CASCADE;
 CREATE MATERIALIZED VIEW 		grid.egon_buffer_75_hoes AS
-	SELECT 	osm_id, ST_Area(ST_Transform(grid.egon_summary_de_hoes.polygon,4326)) as area, ST_Buffer_Meters(ST_Transform(grid.egon_summary_de_hoes.polygon,4326), 75) as buffer_75
+	SELECT 	osm_id, ST_Area(ST_Transform(grid.egon_summary_de_hoes.polygon,4326)) as area, ST_Buffer_Meters(ST_Transform(grid.egon_summary_de_hoes.polygon,4326), 75, 32632) as buffer_75
 	FROM 	grid.egon_summary_de_hoes;
 
 -- create second view with same data to compare
 DROP MATERIALIZED VIEW IF EXISTS 	grid.egon_buffer_75_a_hoes CASCADE;
 CREATE MATERIALIZED VIEW 		grid.egon_buffer_75_a_hoes AS
-	SELECT 	osm_id, ST_Area(ST_Transform(grid.egon_summary_de_hoes.polygon,4326)) as area_a, ST_Buffer_Meters(ST_Transform(grid.egon_summary_de_hoes.polygon,4326), 75) as buffer_75_a
+	SELECT 	osm_id, ST_Area(ST_Transform(grid.egon_summary_de_hoes.polygon,4326)) as area_a, ST_Buffer_Meters(ST_Transform(grid.egon_summary_de_hoes.polygon,4326), 75, 32632) as buffer_75_a
 	FROM 	grid.egon_summary_de_hoes;
 
 -- create view to eliminate smaller substations where buffers intersect
@@ -17,7 +17,9 @@ import codecs
 import json
 import os
 
+from airflow.operators.python_operator import PythonOperator
 from geoalchemy2 import Geometry
+from sqlalchemy import text
 import geopandas as gpd
 
 from egon.data import db
@@ -47,74 +49,99 @@ def download_files():
         urlretrieve(vg250_config["source"]["url"], target_file)
 
 
-def to_postgres():
+def create_schema():
+    """Create the target schema of the VG250 tables."""
+    vg250_processed = egon.data.config.datasets()["vg250"]["processed"]
 
+    db.execute_sql(f"CREATE SCHEMA IF NOT EXISTS {vg250_processed['schema']};")
+
+
+def to_postgres(filename, table):
+    """Import one VG250 shape file into the database.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the shape file within the zip archive
+    table : str
+        Name of the target table
+
+    """
     # Get information from data configuraiton file
     data_config = egon.data.config.datasets()
     vg250_orig = data_config["vg250"]["original_data"]
     vg250_processed = data_config["vg250"]["processed"]
 
-    # Create target schema
-    db.execute_sql(f"CREATE SCHEMA IF NOT EXISTS {vg250_processed['schema']};")
-
     zip_file = Path(".") / "vg250" / vg250_orig["target"]["file"]
     engine_local_db = db.engine()
 
-    # Extract shapefiles from zip archive and send it to postgres db
-    for filename, table in vg250_processed["file_table_map"].items():
-        # Open files and read .shp (within .zip) with geopandas
-        data = gpd.read_file(
-            f"zip://{zip_file}!vg250_01-01.geo84.shape.ebenen/"
-            f"vg250_ebenen_0101/{filename}"
-        )
-
-        boundary = settings()["egon-data"]["--dataset-boundary"]
-        if boundary != "Everything":
-            # read-in borders of federal state Schleswig-Holstein
-            data_sta = gpd.read_file(
-                f"zip://{zip_file}!vg250_01-01.geo84.shape.ebenen/"
-                f"vg250_ebenen_0101/VG250_LAN.shp"
-            ).query(f"GEN == '{boundary}'")
-            data_sta.BEZ = "Bundesrepublik"
-            data_sta.NUTS = "DE"
-            # import borders of Schleswig-Holstein as borders of state
-            if table == "vg250_sta":
-                data = data_sta
-            # choose only areas in Schleswig-Holstein
-            else:
-                data = data[
-                    data.within(data_sta.dissolve(by="GEN").geometry.values[0])
-                ]
-
-        # Set index column and format column headings
-        data.index.set_names("id", inplace=True)
-        data.columns = [x.lower() for x in data.columns]
+    # Open files and read .shp (within .zip) with geopandas
+    data = gpd.read_file(
+        f"zip://{zip_file}!vg250_01-01.geo84.shape.ebenen/"
+        f"vg250_ebenen_0101/{filename}"
+    )
 
+    boundary = settings()["egon-data"]["--dataset-boundary"]
+    if boundary != "Everything":
+        # read-in borders of federal state Schleswig-Holstein
+        data_sta = gpd.read_file(
+            f"zip://{zip_file}!vg250_01-01.geo84.shape.ebenen/"
+            f"vg250_ebenen_0101/VG250_LAN.shp"
+        ).query(f"GEN == '{boundary}'")
+        data_sta.BEZ = "Bundesrepublik"
+        data_sta.NUTS = "DE"
+
+        # import borders of Schleswig-Holstein as borders of state
+        if table == "vg250_sta":
+            data = data_sta
+        # choose only areas in Schleswig-Holstein, the spatial join
+        # queries the index of the areas with the state polygon
+        else:
+            state = data_sta.dissolve(by="GEN")[["geometry"]]
+            data = data[
+                data.index.isin(
+                    gpd.sjoin(
+                        data,
+                        state,
+                        how="inner",
+                        predicate="within",
+                    ).index
+                )
+            ]
+
+    # Set index column and format column headings
+    data.index.set_names("id", inplace=True)
+    data.columns = [x.lower() for x in data.columns]
+
+    # Replace the table and add its keys within one transaction
+    with engine_local_db.begin() as con:
         # Drop table before inserting data
-        db.execute_sql(
-            f"DROP TABLE IF EXISTS "
-            f"{vg250_processed['schema']}.{table} CASCADE;"
+        con.execute(
+            text(
+                f"DROP TABLE IF EXISTS "
+                f"{vg250_processed['schema']}.{table} CASCADE;"
+            )
         )
 
         # create database table from geopandas dataframe
         data.to_postgis(
             table,
-            engine_local_db,
+            con,
             schema=vg250_processed["schema"],
             index=True,
             if_exists="replace",
             dtype={"geometry": Geometry()},
         )
 
-        db.execute_sql(
-            f"ALTER TABLE {vg250_processed['schema']}.{table} "
-            f"ADD PRIMARY KEY (id);"
-        )
-
-        # Add index on geometry column
-        db.execute_sql(
-            f"CREATE INDEX {table}_geometry_idx ON "
-            f"{vg250_processed['schema']}.{table} USING gist (geometry);"
+        # Add primary key and index on geometry column
+        con.execute(
+            text(
+                f"ALTER TABLE {vg250_processed['schema']}.{table} "
+                f"ADD PRIMARY KEY (id); "
+                f"CREATE INDEX {table}_geometry_idx ON "
+                f"{vg250_processed['schema']}.{table} "
+                f"USING gist (geometry);"
+            )
         )
 
 
@@ -175,15 +202,19 @@ def add_metadata():
         "licenses": licenses,
     }
 
+    schema = vg250_config["processed"]["schema"]
+    publication_date = datetime.date.today().isoformat()
+    contribution_date = time.strftime("%Y-%m-%d")
+    comments = {}
     for table in vg250_config["processed"]["file_table_map"].values():
-        schema_table = ".".join([vg250_config["processed"]["schema"], table])
+        schema_table = ".".join([schema, table])
         meta = {
             "name": schema_table,
             "title": title_and_description[table]["title"],
             "id": "WILL_BE_SET_AT_PUBLICATION",
             "description": title_and_description[table]["title"],
             "language": ["de-DE"],
-            "publicationDate": datetime.date.today().isoformat(),
+            "publicationDate": publication_date,
             "context": context(),
             "spatial": {
                 "location": None,
@@ -206,14 +237,14 @@ def add_metadata():
                 {
                     "title": "Guido Pleßmann",
                     "email": "http://github.com/gplssm",
-                    "date": time.strftime("%Y-%m-%d"),
+                    "date": contribution_date,
                     "object": None,
                     "comment": "Imported data",
                 },
                 {
                     "title": "Jonathan Amme",
                     "email": "http://github.com/nesnoj",
-                    "date": time.strftime("%Y-%m-%d"),
+                    "date": contribution_date,
                     "object": None,
                     "comment": "Metadata extended",
                 },
@@ -236,11 +267,22 @@ def add_metadata():
             "metaMetadata": meta_metadata(),
         }
 
-        meta_json = "'" + json.dumps(meta) + "'"
+        comments[schema_table] = "'" + json.dumps(meta) + "'"
 
-        db.submit_comment(
-            meta_json, vg250_config["processed"]["schema"], table
-        )
+    # Write all table comments within one transaction
+    with db.engine().begin() as con:
+        for schema_table, meta_json in comments.items():
+            con.execute(
+                text(f"COMMENT ON TABLE {schema_table} IS {meta_json};")
+            )
+            # Query table comment and cast it into JSON
+            # The query throws an error if JSON is invalid
+            con.execute(
+                text(
+                    f"SELECT obj_description('{schema_table}'::regclass)"
+                    f"::json"
+                )
+            )
 
 
 def nuts_mview():
@@ -438,13 +480,39 @@ class Vg250(Dataset):
     ]
 
     def __init__(self, dependencies):
+        def dyn_parallel_tasks():
+            """Dynamically generate one import task per VG250 table
+
+            The tables are independent of each other, so the shape files
+            are read and written in parallel.
+
+            Returns
+            -------
+            set of airflow.PythonOperators
+                The tasks. Each element is of
+                :func:`egon.data.datasets.vg250.to_postgres`
+            """
+            file_table_map = egon.data.config.datasets()["vg250"]["processed"][
+                "file_table_map"
+            ]
+
+            return {
+                PythonOperator(
+                    task_id=f"vg250.to-postgres-{table.replace('_', '-')}",
+                    python_callable=to_postgres,
+                    op_kwargs={"filename": filename, "table": table},
+                )
+                for filename, table in file_table_map.items()
+            }
+
         super().__init__(
             name="VG250",
-            version=self.filename + "-0.0.4",
+            version=self.filename + "-0.0.5",
             dependencies=dependencies,
             tasks=(
                 download_files,
-                to_postgres,
+                create_schema,
+                {*dyn_parallel_tasks()},
                 nuts_mview,
                 add_metadata,
                 cleaning_and_preperation,
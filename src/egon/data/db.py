@@ -1,6 +1,8 @@
 from contextlib import contextmanager
 import codecs
+import csv
 import functools
+import io
 import os
 import time
 
@@ -126,6 +128,44 @@ def execute_sql_script(script, encoding="utf-8-sig"):
     execute_sql(sqlfile)
 
 
+def copy_insert(table, con, keys, data_iter):
+    """Insert rows using PostgreSQL's COPY command.
+
+    Pass this function as `method` to :meth:`pandas.DataFrame.to_sql` to
+    send all rows at once instead of as single INSERT statements.
+
+    Parameters
+    ----------
+    table : pandas.io.sql.SQLTable
+        Table the rows are inserted into
+    con : sqlalchemy.engine.Connection
+        Connection to the database
+    keys : list of str
+        Names of the columns
+    data_iter : iterable
+        Values of the rows to insert
+
+    Returns
+    -------
+    None.
+
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(data_iter)
+    buffer.seek(0)
+
+    columns = ", ".join(f'"{key}"' for key in keys)
+    if table.schema:
+        target = f'"{table.schema}"."{table.name}"'
+    else:
+        target = f'"{table.name}"'
+
+    with con.connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {target} ({columns}) FROM STDIN WITH CSV", buffer
+        )
+
+
 @contextmanager
 def session_scope():
     """Provide a transactional scope around a series of operations."""
@@ -168,15 +208,18 @@ def session_scoped(function):
     return wrapped
 
 
-def select_dataframe(sql, index_col=None, warning=True):
+def select_dataframe(sql, index_col=None, warning=True, params=None):
     """Select data from local database as pandas.DataFrame
 
     Parameters
     ----------
-    sql : str
+    sql : str or sqlalchemy.sql.expression.TextClause
         SQL query to be executed.
     index_col : str, optional
         Column(s) to set as index(MultiIndex). The default is None.
+    params : dict, optional
+        Values of bind parameters used in `sql`, e.g. `:carrier` in a query
+        created with :func:`sqlalchemy.text`. The default is None.
 
     Returns
     -------
@@ -185,7 +228,7 @@ def select_dataframe(sql, index_col=None, warning=True):
 
     """
 
-    df = pd.read_sql(sql, engine(), index_col=index_col)
+    df = pd.read_sql(sql, engine(), index_col=index_col, params=params)
 
     if df.size == 0 and warning is True:
         print(f"WARNING: No data returned by statement: \n {sql}")